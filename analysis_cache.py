@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from typing import Any
+
+
+_HASH_WINDOW = 1 << 20
+
+
+def pdf_sha256(data) -> str:
+    if isinstance(data, mmap.mmap) and hasattr(mmap, "MADV_DONTNEED"):
+        # hash a mapped upload a window at a time and drop each window from our
+        # RSS once hashed (it stays in the page cache if the parse needs it)
+        h = hashlib.sha256()
+        for start in range(0, len(data), _HASH_WINDOW):
+            end = min(start + _HASH_WINDOW, len(data))
+            h.update(data[start:end])
+            data.madvise(mmap.MADV_DONTNEED, start, end - start)
+        return h.hexdigest()
+    return hashlib.sha256(data).hexdigest()
+
+
+class AnalysisCache:
+    """
+    Content-addressed cache for parsed uploads: sha256(pdf bytes) -> {"text", "skills", ...}.
+
+    Two tiers: an in-process LRU (max_items entries) and, when disk_dir is set,
+    one JSON file per key on disk. The disk tier is shared by every worker
+    process and evicts least recently used files once it grows past disk_max_bytes.
+    """
+
+    def __init__(self, max_items: int = 128, disk_dir: str | None = None,
+                 disk_max_bytes: int = 256 * 1024 * 1024):
+        self.max_items = max_items
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._mem: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = 0
+        self.counters = {"mem_hits": 0, "disk_hits": 0, "misses": 0, "puts": 0, "disk_evictions": 0}
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._scan_disk())
+
+    # public
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._mem.get(key)
+            if entry is not None:
+                self._mem.move_to_end(key)
+                self.counters["mem_hits"] += 1
+                return entry
+
+        entry = self._disk_get(key)
+        with self._lock:
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            self.counters["disk_hits"] += 1
+            self._mem_put(key, entry)
+        return entry
+
+    def put(self, key: str, entry: dict[str, Any]) -> None:
+        with self._lock:
+            self.counters["puts"] += 1
+            self._mem_put(key, entry)
+        self._disk_put(key, entry)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            out: dict[str, Any] = dict(self.counters)
+            lookups = out["mem_hits"] + out["disk_hits"] + out["misses"]
+            out["hit_rate"] = round((lookups - out["misses"]) / lookups, 4) if lookups else 0.0
+            out["mem_items"] = len(self._mem)
+            out["disk_bytes"] = self._disk_bytes
+        return out
+
+    # memory tier (caller holds the lock)
+
+    def _mem_put(self, key: str, entry: dict[str, Any]) -> None:
+        self._mem[key] = entry
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_items:
+            self._mem.popitem(last=False)
+
+    # disk tier
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir or "", key[:2], key + ".json")
+
+    def _disk_get(self, key: str) -> dict[str, Any] | None:
+        if not self.disk_dir:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)  # bump mtime so eviction sees it as recently used
+        except (OSError, ValueError):
+            return None
+        return entry if isinstance(entry, dict) else None
+
+    def _disk_put(self, key: str, entry: dict[str, Any]) -> None:
+        if not self.disk_dir:
+            return
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            size = os.path.getsize(tmp)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            return
+
+        with self._lock:
+            self._disk_bytes += size
+            over = self._disk_bytes > self.disk_max_bytes
+        if over:
+            self._evict_disk()
+
+    def _scan_disk(self):
+        out = []
+        for sub in os.scandir(self.disk_dir):
+            if not sub.is_dir():
+                continue
+            for e in os.scandir(sub.path):
+                if e.name.endswith(".json"):
+                    try:
+                        st = e.stat()
+                    except OSError:
+                        continue
+                    out.append((e.path, st.st_size, st.st_mtime))
+        return out
+
+    def _evict_disk(self) -> None:
+        # other workers write here too, so re-read the directory instead of
+        # trusting our running total, then drop oldest files down to 90%
+        files = sorted(self._scan_disk(), key=lambda x: x[2])
+        total = sum(size for _, size, _ in files)
+        target = int(self.disk_max_bytes * 0.9)
+        evicted = 0
+        for path, size, _ in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+        with self._lock:
+            self._disk_bytes = total
+            self.counters["disk_evictions"] += evicted
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any
+
+
+class MemoryAnalysisStore:
+    """analysis_id -> analysis dict, per process, with a TTL and an item cap."""
+
+    def __init__(self, ttl: float = 6 * 3600, max_items: int = 10000):
+        self.ttl = ttl
+        self.max_items = max_items
+        self._data: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, analysis_id: str) -> dict[str, Any] | None:
+        with self._lock:
+            item = self._data.get(analysis_id)
+            if item is None:
+                return None
+            expires, data = item
+            if expires < time.time():
+                del self._data[analysis_id]
+                return None
+            return data
+
+    def put(self, analysis_id: str, data: dict[str, Any]) -> None:
+        with self._lock:
+            self._data[analysis_id] = (time.time() + self.ttl, data)
+            self._data.move_to_end(analysis_id)
+            # insertion order == expiry order, so the oldest entries go first
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+
+    def delete(self, analysis_id: str) -> None:
+        with self._lock:
+            self._data.pop(analysis_id, None)
+
+    def sweep(self) -> int:
+        now = time.time()
+        removed = 0
+        with self._lock:
+            while self._data:
+                key, (expires, _) = next(iter(self._data.items()))
+                if expires >= now:
+                    break
+                del self._data[key]
+                removed += 1
+        return removed
+
+
+_sqlite_stores: weakref.WeakSet[SqliteAnalysisStore] = weakref.WeakSet()
+
+
+def _drop_connections_after_fork() -> None:
+    # a connection opened in the gunicorn master (preload) must not be used by
+    # the forked workers; each reconnects on first use
+    for store in list(_sqlite_stores):
+        store._local = threading.local()
+
+
+os.register_at_fork(after_in_child=_drop_connections_after_fork)
+
+
+class SqliteAnalysisStore:
+    """
+    Same interface backed by one SQLite file, so every worker process sees
+    the same analyses. Expired rows are swept every sweep_every seconds on write.
+    """
+
+    def __init__(self, path: str, ttl: float = 6 * 3600, sweep_every: float = 300):
+        self.path = path
+        self.ttl = ttl
+        self.sweep_every = sweep_every
+        self._local = threading.local()
+        self._next_sweep = 0.0
+        _sqlite_stores.add(self)
+        # resume previews are personal data: owner-only (sqlite gives -wal/-shm the same mode)
+        os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS analyses ("
+                " id TEXT PRIMARY KEY, data TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS analyses_expires ON analyses (expires)")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, analysis_id: str) -> dict[str, Any] | None:
+        row = self._conn().execute(
+            "SELECT data FROM analyses WHERE id = ? AND expires >= ?", (analysis_id, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+        try:
+            return json.loads(row[0])
+        except ValueError:
+            return None
+
+    def put(self, analysis_id: str, data: dict[str, Any]) -> None:
+        now = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO analyses (id, data, expires) VALUES (?, ?, ?)",
+            (analysis_id, json.dumps(data, ensure_ascii=False), now + self.ttl),
+        )
+        if now >= self._next_sweep:
+            self._next_sweep = now + self.sweep_every
+            self.sweep()
+
+    def delete(self, analysis_id: str) -> None:
+        self._conn().execute("DELETE FROM analyses WHERE id = ?", (analysis_id,))
+
+    def sweep(self) -> int:
+        cur = self._conn().execute("DELETE FROM analyses WHERE expires < ?", (time.time(),))
+        return cur.rowcount
+
+
+# shared by every worker on the host, so any of them can serve a session's analysis
+def make_analysis_store(url: str | None, ttl: float, default_path: str = "analyses.db"):
+    """
+    "sqlite:///path/to/analyses.db" or "memory"; None means SQLite at
+    default_path, whose directory is created owner-only (0700).
+    "memory" is per process: only for a single worker (or tests).
+    """
+    if not url:
+        os.makedirs(os.path.dirname(os.path.abspath(default_path)), mode=0o700, exist_ok=True)
+        return SqliteAnalysisStore(default_path, ttl=ttl)
+    url = url.strip()
+    if url == "memory":
+        return MemoryAnalysisStore(ttl=ttl)
+    if url.startswith("sqlite:///"):
+        return SqliteAnalysisStore(url[len("sqlite:///"):], ttl=ttl)
+    raise ValueError(f"unknown ANALYSIS_STORE {url!r}")
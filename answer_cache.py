@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable
+
+
+def normalize_question(q: str) -> str:
+    # "What should I learn next?" == "what should i learn next"
+    return " ".join(re.sub(r"[^a-z0-9#\.\+\s]+", " ", (q or "").lower()).split()).strip(" .")
+
+
+def answer_key(q: str, data: dict[str, Any], model: str) -> str:
+    parts = [
+        model,
+        normalize_question(q),
+        data.get("path", ""),
+        sorted(data.get("matched", [])),
+        sorted(data.get("missing", [])),
+    ]
+    return hashlib.sha256(json.dumps(parts, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class AnswerCache:
+    """
+    LRU + TTL cache of /ask answers with single-flight coalescing: while one
+    request for a key is waiting on the LLM, identical requests wait for its
+    answer instead of making their own upstream call.
+    """
+
+    def __init__(self, ttl: float = 3600, max_items: int = 2000):
+        self.ttl = ttl
+        self.max_items = max_items
+        self._data: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._inflight: dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "coalesced": 0, "upstream_calls": 0, "upstream_errors": 0}
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            return self._get_locked(key)
+
+    def _get_locked(self, key: str) -> str | None:
+        item = self._data.get(key)
+        if item is not None and item[0] >= time.time():
+            self._data.move_to_end(key)
+            self.counters["hits"] += 1
+            return item[1]
+        if item is not None:
+            del self._data[key]
+        return None
+
+    def put(self, key: str, answer: str) -> None:
+        with self._lock:
+            self._data[key] = (time.time() + self.ttl, answer)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_items:
+                self._data.popitem(last=False)
+
+    def begin(self, key: str) -> tuple[str | None, Future | None, bool]:
+        """
+        (cached, None, False) on a hit. Otherwise (None, future, leader): the
+        leader must call finish(); everyone else waits on future.result().
+        """
+        with self._lock:
+            cached = self._get_locked(key)
+            if cached is not None:
+                return cached, None, False
+            fut = self._inflight.get(key)
+            if fut is not None:
+                self.counters["coalesced"] += 1
+                return None, fut, False
+            self.counters["misses"] += 1
+            self.counters["upstream_calls"] += 1
+            fut = self._inflight[key] = Future()
+            # running futures can't be cancelled, so a follower that gives up
+            # (timeout, disconnect) can't take the answer away from the others
+            fut.set_running_or_notify_cancel()
+            return None, fut, True
+
+    def finish(self, key: str, fut: Future, answer: str | None = None,
+               error: BaseException | None = None) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+            if error is not None:
+                self.counters["upstream_errors"] += 1
+        if answer and error is None:
+            self.put(key, answer)
+        if fut.done():
+            return
+        if error is not None:
+            fut.set_exception(error)
+        else:
+            fut.set_result(answer)
+
+    def get_or_compute(self, key: str, fn: Callable[[], str], timeout: float | None = None) -> str:
+        cached, fut, leader = self.begin(key)
+        if cached is not None:
+            return cached
+        if not leader:
+            return fut.result(timeout=timeout)
+        try:
+            answer = fn()
+        except BaseException as e:
+            self.finish(key, fut, error=e)
+            raise
+        self.finish(key, fut, answer)
+        return answer
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            out: dict[str, Any] = dict(self.counters)
+            out["items"] = len(self._data)
+            out["inflight"] = len(self._inflight)
+        served = out["hits"] + out["coalesced"]
+        total = served + out["misses"]
+        out["hit_rate"] = round(served / total, 4) if total else 0.0
+        return out
@@ -1,80 +1,431 @@
 from __future__ import annotations
 
+import cProfile
+import hmac
+import io
+import json
+import math
 import os
+import tempfile
+import threading
+import time
 import uuid
 from typing import Any
 
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify
-
-# Groq official SDK
-# pip install groq
-from groq import Groq
-
-from roles import ROLES, get_role_config, flatten_all_tracks, build_roadmap_for_role
-from resume_parser import extract_text_from_pdf
-from skill_extractor import extract_skills
+from flask import (Flask, Request, Response, before_render_template, g, render_template, request, redirect,
+                   template_rendered, url_for, session, jsonify)
+
+from roles import catalog, get_role_config, build_multi_roadmap, build_roadmap_for_role
+from resume_parser import (PDF_MAX_SECONDS, REJECT_MESSAGES, TRUNCATED_MESSAGES, UPLOAD_SPOOL_BYTES, PdfRejected,
+                           iter_pdf_pages,
+                           prescreen_pdf, upload_buffer)
+from skill_extractor import SKILL_BANK_VERSION, SkillScanner
+from analysis_cache import AnalysisCache, pdf_sha256
+from sections import SectionScanner, known_chunks, skills_by_section
+from analysis_store import make_analysis_store
+from fragments import FragmentCache
+from answer_cache import AnswerCache, answer_key
+from jobs import JobQueue, QueueFull
+from llm_guard import LLMGuard, LLMUnavailable
+from prompt_context import PromptBuilder, estimate_tokens
+from batch import Throughput, index_results, iter_csv, iter_jsonl, iter_zip, resolve_targets, screen_many, shared_pool
+from resume_index import ResumeIndex
+from scoring import TfidfMatrix, TrackMatrix, match_score, unique_norm_list
+import metrics
+from metrics import timer
 
 
 # App config
 
 ALLOWED_EXTENSIONS = {"pdf"}
+UPLOAD_TMP_DIR = os.environ.get("UPLOAD_TMP_DIR", "").strip() or None
+
+
+class UploadRequest(Request):
+    # Uploads above UPLOAD_SPOOL_KB go to a temp file while the body is read,
+    # so the parse can mmap them instead of holding each one in the heap.
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES, mode="rb+", dir=UPLOAD_TMP_DIR)
+
 
 app = Flask(__name__)
+app.request_class = UploadRequest
 app.secret_key = os.environ.get("FLASK_SECRET_KEY", "dev-secret-change-me")
 app.config["MAX_CONTENT_LENGTH"] = 10 * 1024 * 1024  # 10MB
+BATCH_MAX_CONTENT_LENGTH = int(os.environ.get("BATCH_MAX_UPLOAD_MB", "500")) * 1024 * 1024
+# /batch/screen is off unless BATCH_TOKEN is set, and then needs "Authorization: Bearer <token>"
+BATCH_TOKEN = os.environ.get("BATCH_TOKEN", "").strip()
 
 # Groq
 GROQ_API_KEY = os.environ.get("GROQ_API_KEY", "").strip()
 GROQ_MODEL = os.environ.get("GROQ_MODEL", "llama-3.3-70b-versatile").strip()
+# Point at another OpenAI-compatible server, e.g. benchmarks/fake_llm.py for local testing
+GROQ_BASE_URL = os.environ.get("GROQ_BASE_URL", "").strip() or None
+# SDK retries per call; llm_guard's breaker only sees a failure once these are spent
+GROQ_MAX_RETRIES = int(os.environ.get("GROQ_MAX_RETRIES", "1"))
 # Good alternatives (if you want later):
 # - "llama-3.1-8b-instant" (faster/cheaper)
 # - "mixtral-8x7b-32768" (older but sometimes available)
-groq_client = Groq(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
+_groq_client = None
+_groq_lock = threading.Lock()
+
+
+def groq_client():
+    """The shared Groq client, built on first use (None without an API key)."""
+    global _groq_client
+    if _groq_client is None and GROQ_API_KEY:
+        with _groq_lock:
+            if _groq_client is None:
+                # Groq official SDK (pip install groq); imported here, it adds ~0.2s to startup
+                from groq import Groq
+
+                _groq_client = Groq(api_key=GROQ_API_KEY, base_url=GROQ_BASE_URL, max_retries=GROQ_MAX_RETRIES)
+    return _groq_client
+
+# Parsed uploads by PDF hash (set ANALYSIS_CACHE_DIR to add the shared disk tier)
+analysis_cache = AnalysisCache(
+    max_items=int(os.environ.get("ANALYSIS_CACHE_ITEMS", "128")),
+    disk_dir=os.environ.get("ANALYSIS_CACHE_DIR", "").strip() or None,
+    disk_max_bytes=int(os.environ.get("ANALYSIS_CACHE_DISK_MB", "256")) * 1024 * 1024,
+)
+
+# Section-aware scanning: text is hashed per page/section chunk and a re-upload
+# only re-scans the chunks that changed since the session's last analysis
+INCREMENTAL_ANALYSIS = os.environ.get("INCREMENTAL_ANALYSIS", "1") == "1"
+
+# Analyses live server-side; the cookie session only carries analysis_id
+analysis_store = make_analysis_store(
+    os.environ.get("ANALYSIS_STORE", "").strip() or None,
+    ttl=float(os.environ.get("ANALYSIS_TTL_SECONDS", str(6 * 3600))),
+    default_path=os.path.join(app.instance_path, "analyses.db"),
+)
+
+# Optional background analysis (POST /analyze with async=1 or "Prefer: respond-async");
+# ANALYZE_ASYNC=1 makes the upload form use it. Job status shares the analysis store.
+ANALYZE_ASYNC = os.environ.get("ANALYZE_ASYNC", "0") == "1"
+analysis_jobs = JobQueue(
+    analysis_store,
+    workers=int(os.environ.get("ANALYZE_JOB_WORKERS", "2")),
+    max_queued=int(os.environ.get("ANALYZE_JOB_QUEUE", "32")),
+    timeout=float(os.environ.get("ANALYZE_JOB_TIMEOUT", "60")),
+)
+JOB_WAIT_MAX = 25  # longest a status poll is held open (keep under the proxy timeout)
+
+# /ask answers by (question, role path, matched/missing), with in-flight coalescing
+answer_cache = AnswerCache(
+    ttl=float(os.environ.get("ASK_CACHE_TTL", "3600")),
+    max_items=int(os.environ.get("ASK_CACHE_ITEMS", "2000")),
+)
+ASK_WAIT_SECONDS = 90  # how long a coalesced request waits on the leader's answer
+
+# /ask system prompts: cached per analysis, trimmed to an estimated token budget
+prompt_builder = PromptBuilder(budget=int(os.environ.get("PROMPT_TOKEN_BUDGET", "800")))
+
+# Admission control for Groq calls (per process): refused calls get fallback_answer right away
+llm_guard = LLMGuard(
+    rate=float(os.environ.get("LLM_RATE", "20")),
+    burst=float(os.environ.get("LLM_BURST", "40")),
+    session_rate=float(os.environ.get("LLM_SESSION_RATE", "0.5")),
+    session_burst=float(os.environ.get("LLM_SESSION_BURST", "5")),
+    max_in_flight=int(os.environ.get("LLM_MAX_IN_FLIGHT", "16")),
+    timeout=float(os.environ.get("LLM_TIMEOUT", "30")),
+    breaker_failures=int(os.environ.get("LLM_BREAKER_FAILURES", "5")),
+    breaker_reset=float(os.environ.get("LLM_BREAKER_RESET", "30")),
+)
+
+# Analyzed resumes, for ranking candidates per track. Off unless RESUME_INDEX_DIR is
+# set: it keeps every upload, so it has to live on disk, and /candidates exposes it
+# only with CANDIDATES_TOKEN (sent as "Authorization: Bearer <token>").
+RESUME_INDEX_DIR = os.environ.get("RESUME_INDEX_DIR", "").strip()
+resume_index = ResumeIndex(RESUME_INDEX_DIR) if RESUME_INDEX_DIR else None
+CANDIDATES_TOKEN = os.environ.get("CANDIDATES_TOKEN", "").strip()
+
+# Every track compiled once per catalog version for /suitable
+_track_matrix: tuple[str, TrackMatrix] | None = None
+
+
+def track_matrix() -> TrackMatrix:
+    global _track_matrix
+    cat = catalog()
+    cached = _track_matrix
+    if cached is None or cached[0] != cat.version:
+        cached = _track_matrix = (cat.version, TrackMatrix(list(cat.tracks)))
+    return cached[1]
+
+
+# /suitable scoring: "exact" (match_score semantics) or "tfidf" (weighted, fuzzy);
+# ?mode= overrides per request. The fitted TF-IDF model is kept in TFIDF_CACHE_DIR.
+SCORING_MODE = os.environ.get("SCORING_MODE", "exact").strip().lower()
+SCORING_MODES = ("exact", "tfidf")
+TFIDF_CACHE_DIR = os.environ.get("TFIDF_CACHE_DIR", "models").strip() or None
+TFIDF_CORPUS_LIMIT = int(os.environ.get("TFIDF_CORPUS_LIMIT", "100000"))
+_tfidf_matrix: tuple[str, TfidfMatrix] | None = None
+_tfidf_lock = threading.Lock()
+
+
+def tfidf_matrix() -> TfidfMatrix:
+    global _tfidf_matrix
+    cat = catalog()
+    cached = _tfidf_matrix
+    if cached is None or cached[0] != cat.version:
+        # one fit per catalog version, however many requests arrive before it is done
+        with _tfidf_lock:
+            cached = _tfidf_matrix
+            if cached is None or cached[0] != cat.version:
+                tm = TfidfMatrix.load_or_fit(
+                    list(cat.tracks), f"{cat.version}-{SKILL_BANK_VERSION}", TFIDF_CACHE_DIR,
+                    corpus=lambda: resume_index.skill_lists(TFIDF_CORPUS_LIMIT) if resume_index else [])
+                cached = _tfidf_matrix = (cat.version, tm)
+    return cached[1]
+
+
+# Catalog-derived template fragments (templates/_fragments.html), rendered once per catalog version
+fragment_cache = FragmentCache()
+
+
+@app.template_global()
+def cached_fragment(name: str, *args):
+    """{{ cached_fragment("macro", args...) }}: a macro from _fragments.html, cached by (name, args)."""
+    return fragment_cache.get(catalog().version, (name,) + args,
+                              lambda: getattr(app.jinja_env.get_template("_fragments.html").module, name)(*args))
+
+
+# The dropdown tree for the home page as JSON, built once per catalog version
+_catalog_payload: tuple[str, bytes] | None = None
+
+
+def catalog_payload() -> tuple[str, bytes]:
+    """(catalog version, JSON body): role -> category -> [track names]."""
+    global _catalog_payload
+    cat = catalog()
+    cached = _catalog_payload
+    if cached is None or cached[0] != cat.version:
+        tree = {role: {c: list(trs) for c, trs in cats.items()} for role, cats in cat.roles.items()}
+        cached = _catalog_payload = (cat.version, json.dumps(tree, ensure_ascii=False).encode("utf-8"))
+    return cached
+
+
+def warm_up() -> None:
+    """
+    Load and build what every request needs: the role catalog and its indexes,
+    the /suitable matrix (the TF-IDF one only when it is the default mode),
+    compiled templates, the PDF library and the Groq client. gunicorn calls
+    this once in the master (preload), so forked workers start warm and share
+    these pages instead of each paying for them on their first request.
+    """
+    import PyPDF2  # noqa: F401  (resume_parser imports it lazily)
+
+    track_matrix()
+    # scikit-learn plus the fit cost about a second; a one-off ?mode=tfidf builds it lazily instead
+    if SCORING_MODE == "tfidf":
+        tfidf_matrix()
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+    catalog_payload()
+    groq_client()
+
+
+# Per-request cProfile dump for requests slower than PROFILE_SLOW_MS (off when unset)
+PROFILE_SLOW_MS = float(os.environ.get("PROFILE_SLOW_MS", "0") or 0)
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+_profile_lock = threading.Lock()
+
+metrics.register_collector("resume_analysis_cache", analysis_cache.stats)
+metrics.register_collector("resume_answer_cache", answer_cache.stats)
+metrics.register_collector("resume_llm_guard", llm_guard.stats)
+metrics.register_collector("resume_template_fragments", fragment_cache.stats)
+metrics.register_collector("resume_ask_prompts", prompt_builder.stats)
+metrics.register_collector("resume_analysis_jobs", analysis_jobs.stats)
+
+
+# Instrumentation
+
+@app.before_request
+def _start_request_timer():
+    g.request_started = time.perf_counter()
+    g.route_token = metrics.current_route.set(request.endpoint or "unknown")
+    # one profiled request at a time per process: only one profiler can be active
+    # (3.12+ raises otherwise), so concurrent requests just skip profiling
+    if PROFILE_SLOW_MS > 0 and request.endpoint != "metrics_endpoint" and _profile_lock.acquire(blocking=False):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # another profiling tool (a debugger, an outer cProfile) owns the hook
+            _profile_lock.release()
+        else:
+            g.profiler = profiler
+            g.profile_started = time.perf_counter()
 
 
+@app.after_request
+def _record_request_time(response):
+    started = g.pop("request_started", None)
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    route = request.endpoint or "unknown"
+    metrics.REQUEST_SECONDS.observe(elapsed, route=route)
+    return response
 
-# Helpers
 
-def allowed_file(filename: str) -> bool:
-    return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
+@app.teardown_request
+def _reset_route(exc):
+    # teardown runs even when the view raised, so the profiler is always stopped
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        try:
+            profiler.disable()
+            elapsed = time.perf_counter() - g.pop("profile_started")
+            if elapsed * 1000 >= PROFILE_SLOW_MS:
+                route = request.endpoint or "unknown"
+                os.makedirs(PROFILE_DIR, exist_ok=True)
+                name = f"{time.strftime('%Y%m%d-%H%M%S')}-{route}-{int(elapsed * 1000)}ms-{os.getpid()}.prof"
+                profiler.dump_stats(os.path.join(PROFILE_DIR, name))
+                metrics.SLOW_PROFILES.inc(route=route)
+        finally:
+            _profile_lock.release()
+    token = g.pop("route_token", None)
+    if token is not None:
+        metrics.current_route.reset(token)
+
 
+def _template_started(sender, template, context, **extra):
+    g.render_started = time.perf_counter()
 
-def normalize_skill(s: str) -> str:
-    return " ".join((s or "").strip().lower().split())
 
+def _template_done(sender, template, context, **extra):
+    started = g.pop("render_started", None)
+    if started is not None:
+        metrics.observe_stage("render", time.perf_counter() - started)
 
-def unique_norm_list(items):
-    seen = set()
-    out = []
-    for x in items or []:
-        nx = normalize_skill(x)
-        if nx and nx not in seen:
-            seen.add(nx)
-            out.append(nx)
-    return out
 
+before_render_template.connect(_template_started, app)
+template_rendered.connect(_template_done, app)
 
-def match_score(detected: list[str], blueprint: list[str]) -> tuple[int, list[str], list[str]]:
-    dset = set(unique_norm_list(detected))
-    b = unique_norm_list(blueprint)
 
-    matched = [x for x in b if x in dset]
-    missing = [x for x in b if x not in dset]
+# Helpers
+
+def allowed_file(filename: str) -> bool:
+    return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
-    score = int(round((len(matched) / len(b)) * 100)) if b else 0
-    return score, matched, missing
+
+def bearer_ok(token: str) -> bool:
+    """Whether the request carries "Authorization: Bearer <token>" (compared in constant time)."""
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    return hmac.compare_digest(supplied.encode(), token.encode())
+
+
+def parse_resume(data, label: str = "", max_seconds: float | None = None,
+                 known: dict[str, list[str]] | None = None) -> tuple[str, list[str], list[dict], str | None]:
+    """
+    Text, detected skills, per-chunk sections and the budget that cut the
+    parse short (None when it read everything) for an upload (bytes or an
+    mmap), from the cache when we have seen these bytes. `known` holds chunk
+    hash -> skills from an earlier analysis; only new chunks are scanned.
+    Raises PdfRejected for files we can't use (nothing is cached for them).
+    A parse cut short by the time budget is returned but neither cached nor
+    indexed, so the next upload of the same file gets a full parse; the page
+    and character caps cut every parse the same way, so those are cached.
+    """
+    metrics.PDF_BYTES.inc(len(data))
+    with timer("cache_lookup"):
+        key = pdf_sha256(data)
+        cached = analysis_cache.get(key)
+    truncated = None
+    if cached is not None:
+        text = cached.get("text", "")
+        truncated = cached.get("truncated")
+        if cached.get("bank") == SKILL_BANK_VERSION:
+            if resume_index is not None:
+                resume_index.add(key, cached.get("skills", []), label)
+            return text, cached.get("skills", []), cached.get("sections", []), truncated
+        # skill bank changed since: re-scan the stored text, still no PDF parse
+        with timer("skill_extract"):
+            page_chars = cached.get("pages") or [len(text)]
+            pages, start = [], 0
+            for n in page_chars:
+                pages.append(text[start:start + n])
+                start += n
+            scanner = SectionScanner(known) if INCREMENTAL_ANALYSIS else SkillScanner()
+            for page_text in pages:
+                scanner.feed(page_text)
+            skills = unique_norm_list(scanner.finish())
+    else:
+        # reject junk in milliseconds instead of failing halfway through a parse
+        with timer("prescreen"):
+            prescreen_pdf(data)
+        # scan each page as the pool finishes it; time spent waiting on pages
+        # and time spent scanning them are recorded separately
+        scanner = SectionScanner(known) if INCREMENTAL_ANALYSIS else SkillScanner()
+        pages = []
+        parse_s = scan_s = 0.0
+        it = iter_pdf_pages(data, max_seconds=max_seconds)
+        while True:
+            t0 = time.perf_counter()
+            try:
+                page_text = next(it)
+            except StopIteration as stop:
+                truncated = stop.value
+                parse_s += time.perf_counter() - t0
+                break
+            except Exception as e:
+                raise PdfRejected("unreadable", f"{type(e).__name__}: {e}") from e
+            t1 = time.perf_counter()
+            parse_s += t1 - t0
+            scanner.feed(page_text)
+            pages.append(page_text)
+            scan_s += time.perf_counter() - t1
+        t0 = time.perf_counter()
+        skills = unique_norm_list(scanner.finish())
+        scan_s += time.perf_counter() - t0
+        text = "".join(pages)
+        metrics.PDF_PAGES.inc(len(pages))
+        metrics.observe_stage("pdf_parse", parse_s)
+        metrics.observe_stage("skill_extract", scan_s)
+        if not text.strip():
+            raise PdfRejected("unreadable", "no text extracted")
+
+    sections: list[dict] = []
+    if isinstance(scanner, SectionScanner):
+        sections = scanner.sections
+        metrics.SECTION_CHUNKS.inc(scanner.rescanned, result="rescanned")
+        metrics.SECTION_CHUNKS.inc(len(sections) - scanner.rescanned, result="reused")
+    if truncated == "seconds":
+        app.logger.info("pdf parse stopped at the time budget, not caching %s", key[:12])
+        return text, skills, sections, truncated
+    analysis_cache.put(key, {"text": text, "skills": skills, "bank": SKILL_BANK_VERSION,
+                             "pages": [len(p) for p in pages], "sections": sections, "truncated": truncated})
+    if resume_index is not None:
+        resume_index.add(key, skills, label)
+    return text, skills, sections, truncated
+
+
+def session_chunks() -> dict[str, list[str]]:
+    """Chunk hash -> skills of the session's current analysis, for parse_resume(known=...)."""
+    if not INCREMENTAL_ANALYSIS:
+        return {}
+    return known_chunks((get_analysis() or {}).get("sections"))
 
 
 def get_analysis() -> dict[str, Any] | None:
-    data = session.get("analysis")
-    if not isinstance(data, dict):
+    analysis_id = session.get("analysis_id")
+    data = analysis_store.get(analysis_id) if analysis_id else None
+    if data is None:
+        # cookies written before the server-side store still carry the analysis
+        legacy = session.pop("analysis", None)
+        if isinstance(legacy, dict):
+            save_analysis(legacy)
+            return legacy
         return None
     return data
 
 
 def save_analysis(data: dict[str, Any]) -> None:
-    session["analysis_id"] = str(uuid.uuid4())
-    session["analysis"] = data
+    analysis_id = str(uuid.uuid4())
+    analysis_store.put(analysis_id, data)
+    session["analysis_id"] = analysis_id
+    session.pop("analysis", None)
 
 
 
@@ -82,9 +433,82 @@ def save_analysis(data: dict[str, Any]) -> None:
 
 @app.route("/", methods=["GET"])
 def home():
-    # Your home.html uses roles + roles_data for dropdown chaining
-    role_keys = list(ROLES.keys())
-    return render_template("home.html", roles=role_keys, roles_data=ROLES)
+    # categories/tracks for the dropdowns come from /catalog.json
+    cat = catalog()
+    return render_template("home.html", roles=tuple(cat.roles), catalog_version=cat.version)
+
+
+@app.route("/catalog.json", methods=["GET"])
+def catalog_json():
+    """
+    Role -> category -> track names for the home page dropdowns. Tagged with
+    the catalog version: a conditional GET gets a 304, and ?v=<version> (the
+    URL home.html uses) may be cached by the browser for good.
+    """
+    version, body = catalog_payload()
+    resp = Response(body, mimetype="application/json")
+    resp.set_etag(version)
+    if request.args.get("v") == version:
+        resp.cache_control.public = True
+        resp.cache_control.max_age = 365 * 24 * 3600
+        resp.cache_control.immutable = True
+    else:
+        resp.cache_control.no_cache = True
+    return resp.make_conditional(request)
+
+
+def build_analysis(role: str, category: str, track: str, cfg, text: str,
+                   detected_skills: list[str], sections: list[dict] | None = None,
+                   truncated: str | None = None) -> dict[str, Any]:
+    blueprint = unique_norm_list(cfg["skills"])
+
+    # Compare to blueprint
+    with timer("scoring"):
+        score, matched, missing = match_score(detected_skills, blueprint)
+
+    return {
+        "role": role,
+        "category": category,
+        "track": track,
+        "title": cfg["title"],
+        "path": cfg["path"],
+        "score": score,
+        "blueprint": blueprint,
+        "detected": detected_skills,
+        "matched": unique_norm_list(matched),
+        "missing": unique_norm_list(missing),
+        # keep small preview only (don’t store full resume in session)
+        "preview": text[:600],
+        # per page/section chunk: content hash + skills, reused by the next upload
+        "sections": sections or [],
+        # budget that cut the parse short ("pages", "chars", "seconds"), shown with the score
+        "truncated": truncated,
+    }
+
+
+def analyze_job(stream, filename: str, role: str, category: str, track: str,
+                analysis_id: str, known: dict[str, list[str]] | None = None) -> dict[str, Any]:
+    """Background /analyze: parse the detached upload and store the analysis under analysis_id."""
+    metrics.current_route.set("analyze_job")
+    try:
+        with upload_buffer(stream) as data:
+            text, detected_skills, sections, truncated = parse_resume(
+                data, filename, max_seconds=min(PDF_MAX_SECONDS, analysis_jobs.timeout), known=known)
+    except PdfRejected as e:
+        metrics.UPLOAD_REJECTS.inc(reason=e.code)
+        raise
+    finally:
+        stream.close()
+    cfg = get_role_config(role, category, track)
+    if not cfg:
+        raise ValueError("This role is no longer in the catalog.")
+    analysis = build_analysis(role, category, track, cfg, text, detected_skills, sections, truncated)
+    analysis_store.put(analysis_id, analysis)
+    return {"analysis_id": analysis_id, "score": analysis["score"], "truncated": truncated}
+
+
+def wants_async() -> bool:
+    return request.values.get("async") == "1" or "respond-async" in request.headers.get("Prefer", "")
 
 
 @app.route("/analyze", methods=["GET", "POST"])
@@ -106,67 +530,96 @@ def analyze():
     matched: list[str] = []
     missing: list[str] = []
     resume_text_preview = ""
+    found_in: dict[str, list[str]] = {}
+    truncated = None
+
+    def form_error(message: str, code: str | None = None, status: int = 200):
+        return render_template(
+            "analyze.html",
+            title=title,
+            path=path,
+            role=role,
+            category=category,
+            track=track,
+            blueprint=blueprint,
+            score=score,
+            matched=matched,
+            missing=missing,
+            detected=detected_skills,
+            preview=resume_text_preview,
+            error=message,
+            error_code=code,
+            async_upload=ANALYZE_ASYNC,
+        ), status
+
+    analysis = None
+    job_id = request.args.get("job", "").strip()
+    if request.method == "GET" and job_id:
+        # result page of a background analysis
+        job = analysis_jobs.status(job_id)
+        if job is None:
+            return form_error("That analysis has expired. Please upload again.", "job_not_found", 404)
+        if job["status"] == "failed":
+            return form_error(job.get("error") or "Analysis failed.", job.get("error_code"), 422)
+        if job["status"] == "done":
+            analysis_id = job["result"]["analysis_id"]
+            analysis = analysis_store.get(analysis_id)
+            if analysis is not None:
+                session["analysis_id"] = analysis_id
 
     if request.method == "POST":
         file = request.files.get("resume")
 
         if not file or file.filename == "":
-            return render_template(
-                "analyze.html",
-                title=title,
-                path=path,
-                role=role,
-                category=category,
-                track=track,
-                blueprint=blueprint,
-                score=score,
-                matched=matched,
-                missing=missing,
-                detected=detected_skills,
-                preview=resume_text_preview,
-                error="Please upload a PDF resume.",
-            )
+            return form_error("Please upload a PDF resume.")
 
         if not allowed_file(file.filename):
-            return render_template(
-                "analyze.html",
-                title=title,
-                path=path,
-                role=role,
-                category=category,
-                track=track,
-                blueprint=blueprint,
-                score=score,
-                matched=matched,
-                missing=missing,
-                detected=detected_skills,
-                preview=resume_text_preview,
-                error="Only PDF files are allowed.",
-            )
-
-        # Parse resume + extract skills
-        text = extract_text_from_pdf(file) or ""
-        resume_text_preview = text[:600]
-        detected_skills = unique_norm_list(extract_skills(text))
-
-        # Compare to blueprint
-        score, matched, missing = match_score(detected_skills, blueprint)
-
-        # Save into session (so /suitable, /roadmap, /ask works)
-        save_analysis({
-            "role": role,
-            "category": category,
-            "track": track,
-            "title": title,
-            "path": path,
-            "score": score,
-            "blueprint": blueprint,
-            "detected": detected_skills,
-            "matched": unique_norm_list(matched),
-            "missing": unique_norm_list(missing),
-            # keep small preview only (don’t store full resume in session)
-            "preview": resume_text_preview,
-        })
+            metrics.UPLOAD_REJECTS.inc(reason="not_pdf")
+            return form_error("Only PDF files are allowed.", "not_pdf", 400)
+
+        if wants_async():
+            # the request closes its uploads when it ends; the job takes this one over
+            stream = file.stream
+            file.stream = io.BytesIO()
+            try:
+                job_id = analysis_jobs.submit(analyze_job, stream, file.filename, role, category, track,
+                                              str(uuid.uuid4()), session_chunks(),
+                                              role=role, category=category, track=track)
+            except QueueFull:
+                stream.close()
+                resp = jsonify({"ok": False, "error_code": "queue_full",
+                                "error": "The analyzer is busy right now. Please try again shortly."})
+                resp.headers["Retry-After"] = "5"
+                return resp, 503
+            return jsonify({
+                "ok": True,
+                "job_id": job_id,
+                "status": "queued",
+                "status_url": url_for("job_status", job_id=job_id),
+                "result_url": url_for("analyze", role=role, category=category, track=track, job=job_id),
+            }), 202
+
+        # Parse resume + extract skills (cached by content hash)
+        try:
+            with upload_buffer(file.stream) as data:
+                text, detected, sections, truncated = parse_resume(data, file.filename, known=session_chunks())
+        except PdfRejected as e:
+            metrics.UPLOAD_REJECTS.inc(reason=e.code)
+            app.logger.info("rejected upload %r: %s %s", file.filename, e.code, e.detail)
+            return form_error(str(e), e.code, 422)
+
+        analysis = build_analysis(role, category, track, cfg, text, detected, sections, truncated)
+        # Save server-side, keyed from the session (so /suitable, /roadmap, /ask works)
+        save_analysis(analysis)
+
+    if analysis is not None:
+        score = analysis["score"]
+        matched = analysis["matched"]
+        missing = analysis["missing"]
+        detected_skills = analysis["detected"]
+        resume_text_preview = analysis["preview"]
+        found_in = skills_by_section(analysis.get("sections"))
+        truncated = analysis.get("truncated")
 
     return render_template(
         "analyze.html",
@@ -181,10 +634,86 @@ def analyze():
         missing=unique_norm_list(missing),
         detected=unique_norm_list(detected_skills),
         preview=resume_text_preview,
+        found_in=found_in,
+        truncated=TRUNCATED_MESSAGES.get(truncated),
         error=None,
+        async_upload=ANALYZE_ASYNC,
     )
 
 
+@app.route("/compare", methods=["POST"])
+def compare():
+    """
+    Multi-target analysis: one "resume" upload against many "track" values
+    ("role:category:track", or "all"). Parsed once, scored against every
+    target in one pass; the first track is the baseline for the deltas and
+    becomes the session's analysis (one write, whatever the number of tracks).
+    """
+    try:
+        targets = resolve_targets(request.values.getlist("track") or ["all"])
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+
+    file = request.files.get("resume")
+    if not file or file.filename == "":
+        return jsonify({"ok": False, "error": "Please upload a PDF resume."}), 400
+    if not allowed_file(file.filename):
+        metrics.UPLOAD_REJECTS.inc(reason="not_pdf")
+        return jsonify({"ok": False, "error_code": "not_pdf", "error": "Only PDF files are allowed."}), 400
+
+    try:
+        with upload_buffer(file.stream) as data:
+            text, detected, sections, truncated = parse_resume(data, file.filename, known=session_chunks())
+    except PdfRejected as e:
+        metrics.UPLOAD_REJECTS.inc(reason=e.code)
+        return jsonify({"ok": False, "error_code": e.code, "error": str(e)}), 422
+
+    index = catalog().index
+    with timer("scoring"):
+        results = track_matrix().compare(
+            detected, [index[(t["role"], t["category"], t["track"])] for t in targets])
+
+    base = targets[0]
+    save_analysis(build_analysis(base["role"], base["category"], base["track"],
+                                 get_role_config(base["role"], base["category"], base["track"]),
+                                 text, detected, sections, truncated))
+    ranking = sorted(range(len(results)), key=lambda i: -results[i]["score"])
+    return jsonify({
+        "ok": True,
+        "detected": detected,
+        "truncated": truncated,
+        "baseline": results[0]["path"],
+        "tracks": results,
+        # positions in "tracks", best first (ties keep request order)
+        "ranking": ranking,
+    })
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id: str):
+    """Background analysis status; ?wait=N holds the request until it finishes (up to JOB_WAIT_MAX)."""
+    wait = request.args.get("wait", 0, type=float) or 0
+    if not math.isfinite(wait):
+        return jsonify({"ok": False, "error": "wait must be a number of seconds."}), 400
+    wait = min(max(wait, 0), JOB_WAIT_MAX)
+    job = analysis_jobs.wait(job_id, wait) if wait else analysis_jobs.status(job_id)
+    if job is None:
+        return jsonify({"ok": False, "error_code": "job_not_found", "error": "Unknown or expired job."}), 404
+
+    out = {"ok": True, "job_id": job_id, "status": job["status"]}
+    if job["status"] == "done":
+        # the finished analysis becomes this session's analysis
+        session["analysis_id"] = job["result"]["analysis_id"]
+        session.pop("analysis", None)
+        out["score"] = job["result"]["score"]
+        out["truncated"] = job["result"].get("truncated")
+        out["result_url"] = url_for("analyze", role=job.get("role"), category=job.get("category"),
+                                    track=job.get("track"), job=job_id)
+    elif job["status"] == "failed":
+        out.update(ok=False, error=job.get("error"), error_code=job.get("error_code"))
+    return jsonify(out)
+
+
 @app.route("/suitable", methods=["GET"])
 def suitable():
     data = get_analysis()
@@ -192,24 +721,15 @@ def suitable():
         return redirect(url_for("home"))
 
     detected = data["detected"]
+    mode = request.args.get("mode", SCORING_MODE).strip().lower()
+    if mode not in SCORING_MODES:
+        mode = "exact"
 
-    # score resume against ALL role tracks
-    all_tracks = flatten_all_tracks()
-    results = []
-    for item in all_tracks:
-        sc, _, _ = match_score(detected, item["skills"])
-        results.append({
-            "title": item["title"],
-            "path": item["path"],
-            "role": item["role"],
-            "category": item["category"],
-            "track": item["track"],
-            "score": sc,
-        })
-
-    results.sort(key=lambda x: x["score"], reverse=True)
-    top = results[:10]
-    return render_template("suitable.html", top=top, current=data)
+    # score resume against ALL role tracks in one sparse mat-vec
+    with timer("scoring"):
+        matrix = tfidf_matrix() if mode == "tfidf" else track_matrix()
+        top = matrix.top(detected, 10)
+    return render_template("suitable.html", top=top, current=data, mode=mode)
 
 
 @app.route("/roadmap", methods=["GET"])
@@ -219,10 +739,161 @@ def roadmap():
         return redirect(url_for("home"))
 
     detected = set(data.get("detected", []))
-    steps = build_roadmap_for_role(
-        data["role"], data["category"], data["track"], detected
-    )
-    return render_template("roadmap.html", steps=steps, current=data)
+    # ?top=N: one merged roadmap for the N best /suitable tracks
+    top_n = min(max(request.args.get("top", 0, type=int) or 0, 0), 10)
+    with timer("roadmap"):
+        if top_n:
+            tracks = track_matrix().top(data.get("detected", []), top_n)
+            steps = build_multi_roadmap(tracks, detected)
+        else:
+            tracks = []
+            steps = build_roadmap_for_role(
+                data["role"], data["category"], data["track"], detected
+            )
+    return render_template("roadmap.html", steps=steps, current=data, tracks=tracks)
+
+
+def fallback_answer(data: dict[str, Any], q: str, reason: str | None = None) -> str:
+    # helpful non-AI answer when Groq is not configured, or `reason` it can't be used right now
+    missing = data.get("missing", [])
+    matched = data.get("matched", [])
+    title = data.get("title", "Selected Role")
+
+    fallback = [
+        f"({reason or 'AI is OFF because GROQ_API_KEY is not set.'})",
+        f"Role: {title}",
+    ]
+    if "resume" in q.lower():
+        fallback.append("Quick resume upgrades:")
+        if missing:
+            fallback.append(
+                f"- Add missing keywords in Skills: {', '.join(missing[:10])}")
+        fallback.append(
+            "- Add 1–2 role-relevant projects with measurable impact.")
+        fallback.append("- Add ATS keywords inside experience bullets.")
+    else:
+        if missing:
+            fallback.append(
+                f"Missing skills to learn next: {', '.join(missing[:12])}")
+        if matched:
+            fallback.append(
+                f"Your strong skills: {', '.join(matched[:12])}")
+        if reason is None:
+            fallback.append("Tip: Set GROQ_API_KEY to enable full AI chat.")
+    return "\n".join(fallback)
+
+
+def ask_messages(data: dict[str, Any], q: str, analysis_id: str | None = None) -> list[dict[str, str]]:
+    """Chat messages for one upstream call; records the estimated prompt size."""
+    system, tokens = prompt_builder.system_prompt(data, analysis_id)
+    metrics.PROMPT_TOKENS.observe(tokens + estimate_tokens(q), source="estimate")
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": q},
+    ]
+
+
+def observe_usage(usage) -> None:
+    # prompt size as counted by the provider, when the response carries it
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    if prompt_tokens:
+        metrics.PROMPT_TOKENS.observe(prompt_tokens, source="reported")
+
+
+EMPTY_ANSWER = "I couldn't generate an answer. Try asking in a different way."
+
+
+def groq_answer(data: dict[str, Any], q: str, session_key: str | None = None) -> str:
+    with timer("prompt"):
+        messages = ask_messages(data, q, session_key)
+    with timer("llm"), llm_guard.call(session_key):
+        completion = groq_client().chat.completions.create(
+            model=GROQ_MODEL,
+            messages=messages,
+            temperature=0.35,
+            max_tokens=650,
+            timeout=llm_guard.timeout,
+        )
+    observe_usage(getattr(completion, "usage", None))
+    return (completion.choices[0].message.content or "").strip()
+
+
+def sse(payload: dict[str, Any]) -> str:
+    return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
+def ask_stream(data: dict[str, Any], q: str, session_key: str | None = None) -> Response:
+    """
+    Server-sent events: {"delta": "..."} per completion chunk, then {"done": true}
+    (or {"error": "..."}), so the page can render tokens as they arrive.
+    """
+    def generate():
+        if groq_client() is None:
+            yield sse({"delta": fallback_answer(data, q)})
+            yield sse({"done": True})
+            return
+
+        key = answer_key(q, data, GROQ_MODEL)
+        cached, fut, leader = answer_cache.begin(key)
+        if not leader:
+            # cached, or the same question is already being answered: reuse it
+            try:
+                answer = cached if cached is not None else fut.result(timeout=ASK_WAIT_SECONDS)
+            except LLMUnavailable as e:
+                answer = fallback_answer(data, q, str(e))
+            except Exception as e:
+                yield sse({"error": f"AI error: {str(e)}"})
+                return
+            yield sse({"delta": answer or EMPTY_ANSWER})
+            yield sse({"done": True})
+            return
+
+        parts = []
+        # the body streams after the request has returned, so label the route explicitly
+        started = time.perf_counter()
+        try:
+            with llm_guard.call(session_key):
+                stream = groq_client().chat.completions.create(
+                    model=GROQ_MODEL,
+                    messages=ask_messages(data, q, session_key),
+                    temperature=0.35,
+                    max_tokens=650,
+                    stream=True,
+                    timeout=llm_guard.timeout,
+                )
+                for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        if not parts:
+                            metrics.STAGE_SECONDS.observe(time.perf_counter() - started,
+                                                          route="ask", stage="llm_first_token")
+                        parts.append(delta)
+                        yield sse({"delta": delta})
+            metrics.STAGE_SECONDS.observe(time.perf_counter() - started, route="ask", stage="llm")
+        except LLMUnavailable as e:
+            answer_cache.finish(key, fut, error=e)
+            yield sse({"delta": fallback_answer(data, q, str(e)), "fallback": e.code})
+            yield sse({"done": True})
+            return
+        except Exception as e:
+            answer_cache.finish(key, fut, error=e)
+            yield sse({"error": f"AI error: {str(e)}"})
+            return
+        except BaseException:
+            # client went away mid-stream; don't leave coalesced requests waiting
+            answer_cache.finish(key, fut, error=RuntimeError("upstream answer was abandoned"))
+            raise
+
+        answer = "".join(parts).strip()
+        answer_cache.finish(key, fut, answer)
+        if not answer:
+            yield sse({"delta": EMPTY_ANSWER})
+        yield sse({"done": True})
+
+    return Response(generate(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # don't let a proxy hold the chunks back
+    })
 
 
 @app.route("/ask", methods=["POST"])
@@ -232,6 +903,7 @@ def ask():
     - role-aware
     - blueprint + matched/missing aware
     - answers ANY question about the role: learning plan, interview, projects, resume, etc.
+    - {"stream": true} in the body streams the answer back as server-sent events
     """
     data = get_analysis()
     if not data:
@@ -242,81 +914,24 @@ def ask():
     if not q:
         return jsonify({"ok": False, "answer": "Type a question first."}), 400
 
-    # If Groq key not set, fall back to a helpful non-AI answer
-    if not GROQ_API_KEY or not groq_client:
-        missing = data.get("missing", [])
-        matched = data.get("matched", [])
-        title = data.get("title", "Selected Role")
-
-        fallback = [
-            f"(AI is OFF because GROQ_API_KEY is not set.)",
-            f"Role: {title}",
-        ]
-        if "resume" in q.lower():
-            fallback.append("Quick resume upgrades:")
-            if missing:
-                fallback.append(
-                    f"- Add missing keywords in Skills: {', '.join(missing[:10])}")
-            fallback.append(
-                "- Add 1–2 role-relevant projects with measurable impact.")
-            fallback.append("- Add ATS keywords inside experience bullets.")
-        else:
-            if missing:
-                fallback.append(
-                    f"Missing skills to learn next: {', '.join(missing[:12])}")
-            if matched:
-                fallback.append(
-                    f"Your strong skills: {', '.join(matched[:12])}")
-            fallback.append("Tip: Set GROQ_API_KEY to enable full AI chat.")
-        return jsonify({"ok": True, "answer": "\n".join(fallback)})
-
-    title = data.get("title", "Selected Role")
-    path = data.get("path", "")
-    score = data.get("score", 0)
-    blueprint = data.get("blueprint", [])
-    detected = data.get("detected", [])
-    matched = data.get("matched", [])
-    missing = data.get("missing", [])
-    preview = data.get("preview", "")
-
-    system_prompt = f"""
-You are an expert IT career mentor + hiring manager.
-Answer the user's question about the selected role in a practical, accurate, structured way.
-
-Selected role: {title}
-Path: {path}
-Resume match score: {score}%
+    session_key = session.get("analysis_id")
+    if payload.get("stream"):
+        return ask_stream(data, q, session_key)
 
-Role blueprint skills (target): {", ".join(blueprint)}
-Detected in resume: {", ".join(detected)}
-Matched: {", ".join(matched)}
-Missing: {", ".join(missing)}
-
-Resume preview (partial):
-{preview}
-
-Rules:
-- Be crisp, no fluff. Use short headings + bullets.
-- If user asks what to learn next: prioritize missing skills, give a step-by-step plan.
-- If user asks interview prep: give role-specific Qs + strong answers + common mistakes.
-- If user asks projects: suggest 2–3 projects tailored to the role (stack, features, metrics, resume bullets).
-- If user asks resume improvements: give ATS-friendly bullet rewrites + missing keywords.
-"""
+    # If Groq key not set, fall back to a helpful non-AI answer
+    if groq_client() is None:
+        return jsonify({"ok": True, "answer": fallback_answer(data, q)})
 
     try:
-        completion = groq_client.chat.completions.create(
-            model=GROQ_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": q},
-            ],
-            temperature=0.35,
-            max_tokens=650,
+        # repeated / concurrent identical questions share one upstream call
+        answer = answer_cache.get_or_compute(
+            answer_key(q, data, GROQ_MODEL), lambda: groq_answer(data, q, session_key), timeout=ASK_WAIT_SECONDS
         )
-        answer = (completion.choices[0].message.content or "").strip()
-        if not answer:
-            answer = "I couldn't generate an answer. Try asking in a different way."
-        return jsonify({"ok": True, "answer": answer})
+        return jsonify({"ok": True, "answer": answer or EMPTY_ANSWER})
+
+    except LLMUnavailable as e:
+        # circuit open / over the rate / too many calls in flight: answer without the LLM
+        return jsonify({"ok": True, "answer": fallback_answer(data, q, str(e)), "fallback": e.code})
 
     except Exception as e:
         # show a clean message to UI
@@ -326,5 +941,147 @@ Rules:
         }), 500
 
 
+@app.route("/candidates", methods=["GET"])
+def candidates():
+    """
+    Analyzed resumes ranked for one track (?role=&category=&track=&page=&per_page=).
+    Needs RESUME_INDEX_DIR and the CANDIDATES_TOKEN bearer token. Results carry
+    scores and skills only; ?identity=1 adds each resume's content hash and filename.
+    """
+    if resume_index is None or not CANDIDATES_TOKEN:
+        return jsonify({"ok": False, "error": "Candidate search is not enabled."}), 404
+    if not bearer_ok(CANDIDATES_TOKEN):
+        return jsonify({"ok": False, "error": "Not authorized."}), 403
+
+    role = request.args.get("role", "").strip()
+    category = request.args.get("category", "").strip()
+    track = request.args.get("track", "").strip()
+    cfg = get_role_config(role, category, track)
+    if not cfg:
+        return jsonify({"ok": False, "error": "Unknown role/category/track."}), 404
+
+    page = max(request.args.get("page", 1, type=int) or 1, 1)
+    per_page = min(max(request.args.get("per_page", 20, type=int) or 20, 1), 200)
+    with timer("scoring"):
+        found = resume_index.search(cfg["skills"], offset=(page - 1) * per_page, limit=per_page)
+    results = found["results"]
+    if request.args.get("identity") != "1":
+        results = [{k: v for k, v in r.items() if k not in ("key", "label")} for r in results]
+    return jsonify({
+        "ok": True,
+        "title": cfg["title"],
+        "path": cfg["path"],
+        "page": page,
+        "per_page": per_page,
+        "total": found["total"],
+        "results": results,
+    })
+
+
+@app.errorhandler(413)
+def upload_too_large(e):
+    """
+    JSON for API uploads; a browser form post to /analyze gets the page back
+    with the error. The body is never read here, so only the query string
+    (role/category/track) and headers (Prefer: respond-async) are looked at.
+    """
+    metrics.UPLOAD_REJECTS.inc(reason="too_large")
+    message = REJECT_MESSAGES["too_large"]
+    cfg = None
+    if (request.endpoint == "analyze" and request.args.get("async") != "1"
+            and "respond-async" not in request.headers.get("Prefer", "")
+            and request.accept_mimetypes.best_match(["text/html", "application/json"]) != "application/json"):
+        role = request.args.get("role", "").strip()
+        category = request.args.get("category", "").strip()
+        track = request.args.get("track", "").strip()
+        cfg = get_role_config(role, category, track)
+    if not cfg:
+        return jsonify({"ok": False, "error_code": "too_large", "error": message}), 413
+    return render_template(
+        "analyze.html",
+        title=cfg["title"],
+        path=cfg["path"],
+        role=role,
+        category=category,
+        track=track,
+        blueprint=unique_norm_list(cfg["skills"]),
+        score=None,
+        matched=[],
+        missing=[],
+        detected=[],
+        preview="",
+        error=message,
+        error_code="too_large",
+        async_upload=ANALYZE_ASYNC,
+    ), 413
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics_endpoint():
+    return Response(metrics.render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/batch/screen", methods=["POST"])
+def batch_screen():
+    """
+    Bulk screening: multipart "resumes" (PDFs and/or .zip archives), one or more
+    "track" values ("role:category:track" or "all"), "format" jsonl|csv.
+    Results stream back as each file finishes; jsonl ends with a summary line.
+    Needs the BATCH_TOKEN bearer token, checked before the body is read.
+    """
+    if not BATCH_TOKEN:
+        return jsonify({"ok": False, "error": "Batch screening is not enabled."}), 404
+    if not bearer_ok(BATCH_TOKEN):
+        return jsonify({"ok": False, "error": "Not authorized."}), 403
+    request.max_content_length = BATCH_MAX_CONTENT_LENGTH
+
+    try:
+        targets = resolve_targets(request.values.getlist("track") or ["all"])
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+
+    uploads = [f for f in request.files.getlist("resumes") if f and f.filename]
+    if not uploads:
+        return jsonify({"ok": False, "error": "Upload at least one PDF or .zip file."}), 400
+
+    fmt = request.values.get("format", "jsonl").strip().lower()
+    if fmt not in ("jsonl", "csv"):
+        return jsonify({"ok": False, "error": "format must be jsonl or csv"}), 400
+
+    # The request closes its uploads when the view returns, before the streamed
+    # body is consumed, so take the spooled streams over and close them ourselves.
+    streams = []
+    for f in uploads:
+        streams.append((f.filename, f.stream))
+        f.stream = io.BytesIO()
+
+    def sources():
+        for filename, stream in streams:
+            if filename.lower().endswith(".zip"):
+                yield from iter_zip(stream, filename + "!")
+            elif allowed_file(filename):
+                yield filename, stream.read()
+
+    def generate():
+        stats = Throughput()
+        results = screen_many(sources(), targets, executor=shared_pool(), stats=stats)
+        if resume_index is not None:
+            results = index_results(results, resume_index)
+        try:
+            yield from (iter_jsonl(results) if fmt == "jsonl" else iter_csv(results))
+        finally:
+            for _, stream in streams:
+                stream.close()
+        summary = stats.summary()
+        for reason, n in summary["rejected"].items():
+            metrics.UPLOAD_REJECTS.inc(n, reason=reason)
+        app.logger.info("batch screen: %s", summary)
+        if fmt == "jsonl":
+            yield json.dumps({"summary": summary}) + "\n"
+
+    mimetype = "application/x-ndjson" if fmt == "jsonl" else "text/csv"
+    return Response(generate(), mimetype=mimetype)
+
+
 if __name__ == "__main__":
     app.run(debug=True)
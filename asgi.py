@@ -0,0 +1,289 @@
+"""
+Async serving mode.
+
+    uvicorn asgi:application --host 0.0.0.0 --port $PORT --workers 2
+
+POST /ask runs natively on the event loop with one shared AsyncGroq client
+(pooled keep-alive connections), so hundreds of concurrent questions wait on
+the network without holding a thread each. Every other route is the regular
+Flask app, run on a bounded thread pool (ASGI_SYNC_THREADS) so PDF parsing
+and skill matching never block the loop.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.cookies import SimpleCookie
+from tempfile import SpooledTemporaryFile
+from typing import TYPE_CHECKING, Any
+
+import httpx
+from asgiref.wsgi import WsgiToAsgiInstance
+
+import app as web
+import metrics
+
+if TYPE_CHECKING:
+    from groq import AsyncGroq
+
+ASGI_SYNC_THREADS = int(os.environ.get("ASGI_SYNC_THREADS", "16"))
+ASK_MAX_CONNECTIONS = int(os.environ.get("ASK_MAX_CONNECTIONS", "200"))
+ASK_MAX_BODY = 64 * 1024
+
+_sync_pool = ThreadPoolExecutor(max_workers=ASGI_SYNC_THREADS, thread_name_prefix="wsgi")
+_groq: AsyncGroq | None = None
+
+
+def async_groq() -> AsyncGroq | None:
+    # created inside the running loop, shared by every request of this worker
+    global _groq
+    if _groq is None and web.GROQ_API_KEY:
+        from groq import AsyncGroq
+
+        _groq = AsyncGroq(
+            api_key=web.GROQ_API_KEY,
+            base_url=web.GROQ_BASE_URL,
+            max_retries=web.GROQ_MAX_RETRIES,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=ASK_MAX_CONNECTIONS,
+                                    max_keepalive_connections=ASK_MAX_CONNECTIONS),
+                timeout=httpx.Timeout(60.0, connect=5.0),
+            ),
+        )
+    return _groq
+
+
+# Flask on the thread pool
+
+class _WsgiInstance(WsgiToAsgiInstance):
+    """asgiref's adapter, but run on our bounded pool instead of one shared thread."""
+
+    async def __call__(self, scope, receive, send):
+        self.scope = scope
+        self.loop = asyncio.get_running_loop()
+        self.send = send
+        with SpooledTemporaryFile(max_size=65536) as body:
+            while True:
+                message = await receive()
+                if message["type"] != "http.request":
+                    return
+                body.write(message.get("body", b""))
+                if not message.get("more_body"):
+                    break
+            body.seek(0)
+            await self.loop.run_in_executor(_sync_pool, self._run, body)
+
+    def sync_send(self, message: dict[str, Any]) -> None:
+        asyncio.run_coroutine_threadsafe(self.send(message), self.loop).result()
+
+    def _run(self, body) -> None:
+        environ = self.build_environ(self.scope, body)
+        result = web.app(environ, self.start_response)
+        try:
+            for output in result:
+                if not self.response_started:
+                    self.response_started = True
+                    self.sync_send(self.response_start)
+                if output:
+                    self.sync_send({"type": "http.response.body", "body": output, "more_body": True})
+        finally:
+            if hasattr(result, "close"):
+                result.close()
+        if not self.response_started:
+            self.response_started = True
+            self.sync_send(self.response_start)
+        self.sync_send({"type": "http.response.body"})
+
+
+# async /ask
+
+async def _read_body(receive, limit: int) -> bytes | None:
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            return None
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > limit:
+            return None
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+def _session_analysis_id(scope) -> str | None:
+    raw = b"; ".join(v for k, v in scope.get("headers", []) if k == b"cookie").decode("latin1")
+    morsel = SimpleCookie(raw).get(web.app.config["SESSION_COOKIE_NAME"])
+    if morsel is None:
+        return None
+    serializer = web.app.session_interface.get_signing_serializer(web.app)
+    try:
+        data = serializer.loads(
+            morsel.value, max_age=int(web.app.permanent_session_lifetime.total_seconds())
+        )
+    except Exception:
+        return None
+    return data.get("analysis_id") if isinstance(data, dict) else None
+
+
+async def _send_json(send, status: int, payload: dict[str, Any]) -> None:
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", b"application/json"),
+                            (b"content-length", str(len(body)).encode())]})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _start_sse(send) -> None:
+    await send({"type": "http.response.start", "status": 200,
+                "headers": [(b"content-type", b"text/event-stream"),
+                            (b"cache-control", b"no-cache"),
+                            (b"x-accel-buffering", b"no")]})
+
+
+async def _send_sse(send, payload: dict[str, Any], last: bool = False) -> None:
+    await send({"type": "http.response.body", "body": web.sse(payload).encode("utf-8"),
+                "more_body": not last})
+
+
+async def ask(scope, receive, send) -> None:
+    body = await _read_body(receive, ASK_MAX_BODY)
+    loop = asyncio.get_running_loop()
+    analysis_id = _session_analysis_id(scope)
+    data = await loop.run_in_executor(_sync_pool, web.analysis_store.get, analysis_id) if analysis_id else None
+    if not data:
+        await _send_json(send, 400, {"ok": False, "answer": "Upload and analyze a resume first."})
+        return
+
+    try:
+        payload = json.loads(body or b"{}")
+    except ValueError:
+        payload = {}
+    payload = payload if isinstance(payload, dict) else {}
+    q = (payload.get("q") or "").strip()
+    if not q:
+        await _send_json(send, 400, {"ok": False, "answer": "Type a question first."})
+        return
+    stream = bool(payload.get("stream"))
+
+    client = async_groq()
+    if client is None:
+        answer = web.fallback_answer(data, q)
+        if stream:
+            await _start_sse(send)
+            await _send_sse(send, {"delta": answer})
+            await _send_sse(send, {"done": True}, last=True)
+        else:
+            await _send_json(send, 200, {"ok": True, "answer": answer})
+        return
+
+    key = web.answer_key(q, data, web.GROQ_MODEL)
+    cached, fut, leader = web.answer_cache.begin(key)
+
+    if not leader:
+        try:
+            # shielded: giving up on the wait must not cancel the shared future
+            answer = cached if cached is not None else await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(fut)), web.ASK_WAIT_SECONDS)
+        except web.LLMUnavailable as e:
+            answer, error = web.fallback_answer(data, q, str(e)), None
+        except Exception as e:
+            answer, error = None, f"AI error: {str(e)}"
+        else:
+            error = None
+        if stream:
+            await _start_sse(send)
+            if error:
+                await _send_sse(send, {"error": error}, last=True)
+            else:
+                await _send_sse(send, {"delta": answer or web.EMPTY_ANSWER})
+                await _send_sse(send, {"done": True}, last=True)
+        elif error:
+            await _send_json(send, 500, {"ok": False, "answer": error})
+        else:
+            await _send_json(send, 200, {"ok": True, "answer": answer or web.EMPTY_ANSWER})
+        return
+
+    request_args = dict(model=web.GROQ_MODEL, messages=web.ask_messages(data, q, analysis_id),
+                        temperature=0.35, max_tokens=650, timeout=web.llm_guard.timeout)
+    if not stream:
+        try:
+            started = time.perf_counter()
+            with web.llm_guard.call(analysis_id):
+                completion = await client.chat.completions.create(**request_args)
+            metrics.STAGE_SECONDS.observe(time.perf_counter() - started, route="ask", stage="llm")
+            web.observe_usage(getattr(completion, "usage", None))
+            answer = (completion.choices[0].message.content or "").strip()
+        except web.LLMUnavailable as e:
+            web.answer_cache.finish(key, fut, error=e)
+            await _send_json(send, 200, {"ok": True, "answer": web.fallback_answer(data, q, str(e)),
+                                         "fallback": e.code})
+            return
+        except Exception as e:
+            web.answer_cache.finish(key, fut, error=e)
+            await _send_json(send, 500, {"ok": False, "answer": f"AI error: {str(e)}"})
+            return
+        except BaseException:
+            web.answer_cache.finish(key, fut, error=RuntimeError("upstream answer was abandoned"))
+            raise
+        web.answer_cache.finish(key, fut, answer)
+        await _send_json(send, 200, {"ok": True, "answer": answer or web.EMPTY_ANSWER})
+        return
+
+    await _start_sse(send)
+    parts = []
+    try:
+        with web.llm_guard.call(analysis_id):
+            chunks = await client.chat.completions.create(stream=True, **request_args)
+            async for chunk in chunks:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    await _send_sse(send, {"delta": delta})
+    except web.LLMUnavailable as e:
+        web.answer_cache.finish(key, fut, error=e)
+        await _send_sse(send, {"delta": web.fallback_answer(data, q, str(e)), "fallback": e.code})
+        await _send_sse(send, {"done": True}, last=True)
+        return
+    except Exception as e:
+        web.answer_cache.finish(key, fut, error=e)
+        await _send_sse(send, {"error": f"AI error: {str(e)}"}, last=True)
+        return
+    except BaseException:
+        # client disconnected / task cancelled; release coalesced waiters
+        web.answer_cache.finish(key, fut, error=RuntimeError("upstream answer was abandoned"))
+        raise
+
+    answer = "".join(parts).strip()
+    web.answer_cache.finish(key, fut, answer)
+    if not answer:
+        await _send_sse(send, {"delta": web.EMPTY_ANSWER})
+    await _send_sse(send, {"done": True}, last=True)
+
+
+async def application(scope, receive, send) -> None:
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                if _groq is not None:
+                    await _groq.close()
+                _sync_pool.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+    if scope["path"] == "/ask" and scope["method"] == "POST":
+        started = time.perf_counter()
+        try:
+            await ask(scope, receive, send)
+        finally:
+            metrics.REQUEST_SECONDS.observe(time.perf_counter() - started, route="ask")
+        return
+    await _WsgiInstance(web.app)(scope, receive, send)
@@ -0,0 +1,386 @@
+"""
+Bulk resume screening: folders and zip archives of PDFs scored against one or
+more tracks from roles.ROLES, spread over a process pool, results streamed as
+they finish.
+
+    python batch.py resumes/ more.zip --track "Developer:Web Developer:Java" -o out.jsonl
+    python batch.py resumes/ --track all --format csv --workers 8 > out.csv
+
+Tracks are "role:category:track" (see flatten_all_tracks), or "all".
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import threading
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Executor, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Iterable, Iterator
+
+from analysis_cache import pdf_sha256
+from resume_index import ResumeIndex
+from resume_parser import REJECT_MESSAGES, PdfRejected, extract_text_from_pdf, prescreen_pdf
+from roles import flatten_all_tracks, get_role_config
+from scoring import match_score, unique_norm_list
+from skill_extractor import extract_skills
+
+TRACK_SEP = ":"
+BATCH_WORKERS = int(os.environ.get("BATCH_WORKERS", str(os.cpu_count() or 2)))
+# uncompressed size caps for zip archives, checked against the entry headers before reading
+ZIP_ENTRY_MAX_BYTES = int(os.environ.get("BATCH_ZIP_ENTRY_MB", "10")) * 1024 * 1024
+ZIP_TOTAL_MAX_BYTES = int(os.environ.get("BATCH_ZIP_TOTAL_MB", "1024")) * 1024 * 1024
+
+CSV_FIELDS = ["file", "sha256", "ok", "error", "error_code", "role", "category", "track", "title",
+              "score", "matched", "missing"]
+
+
+def resolve_targets(specs: Iterable[str]) -> list[dict[str, Any]]:
+    """Turn "role:category:track" specs (or "all") into the configs the workers need."""
+    targets = []
+    for spec in specs:
+        spec = (spec or "").strip()
+        if spec.lower() == "all":
+            cfgs = flatten_all_tracks()
+        else:
+            parts = [p.strip() for p in spec.split(TRACK_SEP)]
+            cfg = get_role_config(*parts) if len(parts) == 3 else None
+            if not cfg:
+                raise ValueError(f"unknown track {spec!r} (expected role{TRACK_SEP}category{TRACK_SEP}track)")
+            cfgs = [cfg]
+        for cfg in cfgs:
+            targets.append({
+                "role": cfg["role"],
+                "category": cfg["category"],
+                "track": cfg["track"],
+                "title": cfg["title"],
+                "blueprint": unique_norm_list(cfg["skills"]),
+            })
+    if not targets:
+        raise ValueError("no tracks to screen against")
+    return targets
+
+
+def iter_zip(fileobj, prefix: str = "") -> Iterator[tuple[str, bytes | None]]:
+    """
+    PDFs in a zip archive. An entry over ZIP_ENTRY_MAX_BYTES, or past
+    ZIP_TOTAL_MAX_BYTES for the whole archive, is not read and comes out as
+    (name, None), which screen_pdf reports as too_large.
+    """
+    total = 0
+    with zipfile.ZipFile(fileobj) as zf:
+        for info in zf.infolist():
+            if info.is_dir() or not info.filename.lower().endswith(".pdf"):
+                continue
+            # ZipExtFile never returns more than file_size, so the header value is a hard cap
+            if info.file_size > ZIP_ENTRY_MAX_BYTES or total + info.file_size > ZIP_TOTAL_MAX_BYTES:
+                yield prefix + info.filename, None
+                continue
+            total += info.file_size
+            yield prefix + info.filename, zf.read(info)
+
+
+def iter_pdf_sources(paths: Iterable[str]) -> Iterator[tuple[str, bytes | None]]:
+    """(name, bytes) for every PDF in the given files, folders (recursive) and zip archives."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for fn in sorted(files):
+                    full = os.path.join(root, fn)
+                    if fn.lower().endswith(".pdf"):
+                        with open(full, "rb") as f:
+                            yield full, f.read()
+                    elif fn.lower().endswith(".zip"):
+                        yield from iter_zip(full, full + "!")
+        elif path.lower().endswith(".zip"):
+            yield from iter_zip(path, path + "!")
+        else:
+            with open(path, "rb") as f:
+                yield path, f.read()
+
+
+def screen_pdf(name: str, data: bytes | None, targets: list[dict[str, Any]]) -> dict[str, Any]:
+    if data is None:
+        # skipped by iter_zip's size caps
+        return {"file": name, "sha256": None, "bytes": 0, "ok": False, "error": REJECT_MESSAGES["too_large"],
+                "error_code": "too_large", "detected": [], "tracks": []}
+    out: dict[str, Any] = {"file": name, "sha256": pdf_sha256(data), "bytes": len(data),
+                           "ok": True, "error": None, "error_code": None, "detected": [], "tracks": []}
+    try:
+        prescreen_pdf(data)
+        # already one file per process, don't fan pages out to threads too
+        text = extract_text_from_pdf(io.BytesIO(data), workers=1) or ""
+    except PdfRejected as e:
+        out.update(ok=False, error=str(e), error_code=e.code)
+        return out
+    except Exception as e:
+        out.update(ok=False, error=f"{type(e).__name__}: {e}", error_code="unreadable")
+        return out
+
+    detected = unique_norm_list(extract_skills(text))
+    out["detected"] = detected
+    for t in targets:
+        score, matched, missing = match_score(detected, t["blueprint"])
+        out["tracks"].append({
+            "role": t["role"],
+            "category": t["category"],
+            "track": t["track"],
+            "title": t["title"],
+            "score": score,
+            "matched": matched,
+            "missing": missing,
+        })
+    return out
+
+
+def _screen_job(job) -> dict[str, Any]:
+    return screen_pdf(*job)
+
+
+_shared_pool: ProcessPoolExecutor | None = None
+_shared_lock = threading.Lock()
+
+
+def shared_pool() -> ProcessPoolExecutor:
+    # one long-lived pool per web worker, so /batch requests don't pay process startup
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is None:
+            _shared_pool = ProcessPoolExecutor(max_workers=BATCH_WORKERS)
+        return _shared_pool
+
+
+def replace_shared_pool(broken: Executor) -> ProcessPoolExecutor:
+    """A fresh shared pool in place of `broken` (a worker died); concurrent callers share one replacement."""
+    global _shared_pool
+    with _shared_lock:
+        if _shared_pool is broken:
+            _shared_pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+    return shared_pool()
+
+
+def _crashed(name: str, data: bytes) -> dict[str, Any]:
+    return {"file": name, "sha256": pdf_sha256(data), "bytes": len(data), "ok": False,
+            "error": "BrokenProcessPool: the worker process screening this file died",
+            "error_code": "unreadable", "detected": [], "tracks": []}
+
+
+class Throughput:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.files = 0
+        self.failed = 0
+        self.rejected: dict[str, int] = {}
+        self.bytes = 0
+
+    def add(self, result: dict[str, Any]) -> None:
+        self.files += 1
+        self.bytes += result.get("bytes", 0)
+        if not result.get("ok"):
+            self.failed += 1
+            code = result.get("error_code") or "unreadable"
+            self.rejected[code] = self.rejected.get(code, 0) + 1
+
+    def summary(self) -> dict[str, Any]:
+        elapsed = time.perf_counter() - self.start
+        return {
+            "files": self.files,
+            "failed": self.failed,
+            "rejected": dict(self.rejected),
+            "mb": round(self.bytes / (1024 * 1024), 2),
+            "seconds": round(elapsed, 3),
+            "files_per_sec": round(self.files / elapsed, 2) if elapsed > 0 else 0.0,
+        }
+
+
+def screen_many(sources: Iterable[tuple[str, bytes | None]], targets: list[dict[str, Any]],
+                workers: int | None = None, executor: Executor | None = None,
+                stats: Throughput | None = None) -> Iterator[dict[str, Any]]:
+    """
+    Yield one result per PDF in completion order (not input order).
+    Only a few jobs per worker are in flight, so a huge folder is never
+    read into memory at once. workers=0 runs everything in this process.
+    If a worker process dies, the pool is replaced and the files that were
+    in flight are retried once, one at a time; a file that breaks the pool
+    again is reported as unreadable.
+    """
+    workers = BATCH_WORKERS if workers is None else workers
+    if executor is None and workers <= 0:
+        for name, data in sources:
+            result = screen_pdf(name, data, targets)
+            if stats:
+                stats.add(result)
+            yield result
+        return
+
+    own = executor is None
+    shared = executor is not None and executor is _shared_pool
+    pool = executor or ProcessPoolExecutor(max_workers=workers)
+    max_in_flight = max(1, workers) * 4
+    it = iter(sources)
+    pending: dict = {}   # future -> (name, data, tries)
+    retry: list[tuple[str, bytes, int]] = []
+
+    def replace(broken):
+        if own:
+            broken.shutdown(wait=False, cancel_futures=True)
+            return ProcessPoolExecutor(max_workers=workers)
+        if shared:
+            return replace_shared_pool(broken)
+        raise BrokenProcessPool("the caller's executor is broken")
+
+    try:
+        while True:
+            if retry:
+                # after a crash, rerun the affected files one at a time so only the culprit fails again
+                if not pending:
+                    name, data, tries = retry.pop()
+                    pending[pool.submit(_screen_job, (name, data, targets))] = (name, data, tries)
+            else:
+                for name, data in it:
+                    if data is None:
+                        result = screen_pdf(name, data, targets)
+                        if stats:
+                            stats.add(result)
+                        yield result
+                        continue
+                    try:
+                        pending[pool.submit(_screen_job, (name, data, targets))] = (name, data, 0)
+                    except BrokenProcessPool:
+                        pool = replace(pool)
+                        pending[pool.submit(_screen_job, (name, data, targets))] = (name, data, 0)
+                    if len(pending) >= max_in_flight:
+                        break
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            lost = []
+            for fut in done:
+                name, data, tries = pending.pop(fut)
+                try:
+                    result = fut.result()
+                except BrokenProcessPool:
+                    lost.append((name, data, tries))
+                    continue
+                if stats:
+                    stats.add(result)
+                yield result
+            if lost:
+                # everything still on the dead pool fails the same way: move it all over
+                lost.extend(pending.values())
+                for fut in pending:
+                    fut.cancel()
+                pending = {}
+                pool = replace(pool)
+                for name, data, tries in lost:
+                    if tries:
+                        result = _crashed(name, data)
+                        if stats:
+                            stats.add(result)
+                        yield result
+                    else:
+                        retry.append((name, data, 1))
+    finally:
+        for fut in pending:
+            fut.cancel()
+        if own:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_jsonl(results: Iterable[dict[str, Any]]) -> Iterator[str]:
+    for r in results:
+        yield json.dumps(r, ensure_ascii=False) + "\n"
+
+
+def iter_csv(results: Iterable[dict[str, Any]]) -> Iterator[str]:
+    # one row per file × track
+    buf = io.StringIO()
+    w = csv.DictWriter(buf, fieldnames=CSV_FIELDS)
+    w.writeheader()
+    yield buf.getvalue()
+    buf.seek(0)
+    buf.truncate()
+    for r in results:
+        base = {"file": r["file"], "sha256": r["sha256"], "ok": r["ok"], "error": r["error"] or "",
+                "error_code": r.get("error_code") or ""}
+        for t in r["tracks"] or [{}]:
+            w.writerow({
+                **base,
+                "role": t.get("role", ""),
+                "category": t.get("category", ""),
+                "track": t.get("track", ""),
+                "title": t.get("title", ""),
+                "score": t.get("score", ""),
+                "matched": ";".join(t.get("matched", [])),
+                "missing": ";".join(t.get("missing", [])),
+            })
+        yield buf.getvalue()
+        buf.seek(0)
+        buf.truncate()
+
+
+def index_results(results: Iterable[dict[str, Any]], index, every: int = 1000) -> Iterator[dict[str, Any]]:
+    """Pass results through, adding the parsed ones to a ResumeIndex in bulk."""
+    pending = []
+    try:
+        for r in results:
+            if r["ok"]:
+                pending.append((r["sha256"], r["detected"], r["file"]))
+                if len(pending) >= every:
+                    index.add_many(pending)
+                    pending = []
+            yield r
+    finally:
+        if pending:
+            index.add_many(pending)
+
+
+def main(argv: list[str] | None = None) -> int:
+    ap = argparse.ArgumentParser(description="Screen many resumes against role tracks.")
+    ap.add_argument("paths", nargs="+", help="PDF files, folders or .zip archives")
+    ap.add_argument("--track", action="append", default=[],
+                    help=f'"role{TRACK_SEP}category{TRACK_SEP}track" or "all" (repeatable)')
+    ap.add_argument("--format", choices=["jsonl", "csv"], default="jsonl")
+    ap.add_argument("-o", "--out", default="-", help="output file (default stdout)")
+    ap.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    ap.add_argument("--index", metavar="DIR", help="also add parsed resumes to the resume index in DIR")
+    args = ap.parse_args(argv)
+
+    try:
+        targets = resolve_targets(args.track or ["all"])
+    except ValueError as e:
+        ap.error(str(e))
+
+    stats = Throughput()
+    results = screen_many(iter_pdf_sources(args.paths), targets, workers=args.workers, stats=stats)
+    if args.index:
+        index = ResumeIndex(args.index)
+        results = index_results(results, index)
+    lines = iter_jsonl(results) if args.format == "jsonl" else iter_csv(results)
+
+    out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8", newline="")
+    try:
+        for chunk in lines:
+            out.write(chunk)
+            out.flush()
+            if stats.files and stats.files % 100 == 0:
+                print(f"{stats.files} files, {stats.summary()['files_per_sec']} files/s", file=sys.stderr)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    if args.index:
+        index.save()
+    print(json.dumps(stats.summary()), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
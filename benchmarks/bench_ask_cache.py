@@ -0,0 +1,102 @@
+"""
+/ask latency with and without the answer cache, against benchmarks/fake_llm.py.
+
+    python benchmarks/bench_ask_cache.py --requests 200 --concurrency 16 --questions 5
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+from fake_llm import FakeLLMConfig, serve  # noqa: E402
+
+QUESTIONS = [
+    "What should I learn next?",
+    "how do I improve my resume",
+    "Give me interview questions",
+    "suggest projects for this role",
+    "what is missing for this role?",
+    "make me a 4 week plan",
+    "which certifications matter",
+    "how to prepare for system design",
+]
+
+
+class NoCache:
+    def get_or_compute(self, key, fn, timeout=None):
+        return fn()
+
+    def stats(self):
+        return {}
+
+
+def run(app_module, n: int, concurrency: int, questions: list[str]) -> list[float]:
+    app_module.analysis_store.put("bench", {
+        "title": "Java Backend Developer", "path": "Developer → Backend Developer → Java",
+        "score": 40, "blueprint": ["java", "spring boot", "docker"], "detected": ["java"],
+        "matched": ["java"], "missing": ["spring boot", "docker"], "preview": "",
+    })
+    rng = random.Random(1)
+    qs = [rng.choice(questions) for _ in range(n)]
+
+    def one(q: str) -> float:
+        client = app_module.app.test_client()
+        with client.session_transaction() as s:
+            s["analysis_id"] = "bench"
+        t0 = time.perf_counter()
+        r = client.post("/ask", json={"q": q})
+        assert r.status_code == 200, r.get_data(as_text=True)
+        return time.perf_counter() - t0
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(one, qs))
+
+
+def report(label: str, lat: list[float], upstream: int, extra: str = "") -> None:
+    lat = sorted(lat)
+    p50 = statistics.median(lat) * 1000
+    p95 = lat[int(len(lat) * 0.95) - 1] * 1000
+    print(f"{label:>8}: p50 {p50:8.1f} ms  p95 {p95:8.1f} ms  upstream calls {upstream:4d} {extra}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--questions", type=int, default=5)
+    ap.add_argument("--first-token-delay", type=float, default=0.15)
+    ap.add_argument("--chunk-delay", type=float, default=0.002)
+    args = ap.parse_args()
+
+    _, url, cfg = serve(cfg=FakeLLMConfig(args.first_token_delay, args.chunk_delay, 40))
+    os.environ["GROQ_API_KEY"] = "fake"
+    os.environ["GROQ_BASE_URL"] = url
+    import app as app_module
+
+    questions = QUESTIONS[:args.questions]
+    cache = app_module.answer_cache
+
+    app_module.answer_cache = NoCache()
+    before = cfg.requests
+    lat = run(app_module, args.requests, args.concurrency, questions)
+    report("no cache", lat, cfg.requests - before)
+
+    app_module.answer_cache = cache
+    before = cfg.requests
+    lat = run(app_module, args.requests, args.concurrency, questions)
+    st = cache.stats()
+    report("cache", lat, cfg.requests - before,
+           f"hit rate {st['hit_rate']:.2%} (coalesced {st['coalesced']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Text normalization + alias expansion on large text dumps: the old
+regex/compact-string normalize_text vs the single-pass tokenizer.
+Time per KB should stay flat as the document grows.
+
+    python benchmarks/bench_normalize.py --pages 1 5 10 25 50 100
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+from skill_extractor import ALIASES, alias_hits, extract_skills, tokenize  # noqa: E402
+from synthetic import resume_text  # noqa: E402
+
+
+def legacy_normalize(text: str) -> str:
+    # normalize_text before the tokenizer
+    t = text.lower()
+    t = re.sub(r"[^a-z0-9\.\#\s]+", " ", t)
+    t = re.sub(r"\s+", " ", t).strip()
+    compact = t.replace(" ", "")
+    for k, v in ALIASES.items():
+        if k in compact:
+            t += " " + v
+    return t
+
+
+def best(fn, repeat: int) -> float:
+    out = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        out = min(out, time.perf_counter() - t0)
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pages", type=int, nargs="+", default=[1, 5, 10, 25, 50, 100])
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    print(f"{'pages':>6} {'KB':>8} {'legacy_ms':>10} {'tokens_ms':>10} {'tokens_us/KB':>13} "
+          f"{'extract_ms':>11} {'extract_us/KB':>14}")
+    for pages in args.pages:
+        text = resume_text(pages, seed=pages)
+        kb = len(text) / 1024
+        legacy = best(lambda: legacy_normalize(text), args.repeat)
+        tok = best(lambda: alias_hits(tokenize(text)), args.repeat)
+        ext = best(lambda: extract_skills(text), args.repeat)
+        print(f"{pages:>6} {kb:>8.1f} {legacy * 1000:>10.2f} {tok * 1000:>10.2f} {tok * 1e6 / kb:>13.1f} "
+              f"{ext * 1000:>11.2f} {ext * 1e6 / kb:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+/candidates: ResumeIndex build, snapshot and reload time, and ranking latency
+per track, against scanning every resume with match_score.
+
+    python benchmarks/bench_resume_index.py --resumes 10000 100000 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resume_index import ResumeIndex  # noqa: E402
+from roles import flatten_all_tracks  # noqa: E402
+from scoring import match_score  # noqa: E402
+from skill_extractor import SKILL_BANK  # noqa: E402
+
+SCAN_LIMIT = 100000  # the match_score scan is only run up to this many resumes
+
+
+def make_rows(n: int, rng: random.Random):
+    # a few skills are on most resumes, most are rare (roughly Zipf)
+    bank = sorted(SKILL_BANK)
+    rng.shuffle(bank)
+    weights = [1 / (i + 1) for i in range(len(bank))]
+    for i in range(n):
+        skills = set(rng.choices(bank, weights, k=rng.randrange(5, 35)))
+        yield f"{i:064x}", sorted(skills), f"resume-{i}.pdf"
+
+
+def scan_top(rows, blueprint, k):
+    # the obvious way: score every resume, sort, slice
+    scored = []
+    for rid, (_, skills, _) in enumerate(rows, 1):
+        score, matched, _ = match_score(skills, blueprint)
+        if matched:
+            scored.append((-score, rid))
+    scored.sort()
+    return [rid for _, rid in scored[:k]]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--resumes", type=int, nargs="+", default=[10000, 100000])
+    ap.add_argument("--queries", type=int, default=50, help="tracks queried per size")
+    ap.add_argument("--per-page", type=int, default=20)
+    args = ap.parse_args()
+
+    rng = random.Random(7)
+    tracks = flatten_all_tracks()
+    print(f"{'resumes':>9} {'build_s':>8} {'save_s':>7} {'snap_MB':>8} {'load_s':>7} "
+          f"{'p1_ms':>7} {'p50_ms':>7} {'p99_ms':>7} {'scan_ms':>9}")
+    for n in args.resumes:
+        rows = list(make_rows(n, rng))
+        with tempfile.TemporaryDirectory() as d:
+            t0 = time.perf_counter()
+            idx = ResumeIndex(d)
+            for i in range(0, n, 50000):
+                idx.add_many(rows[i:i + 50000])
+            build = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            idx.save()
+            save = time.perf_counter() - t0
+            snap_mb = os.path.getsize(os.path.join(d, "postings.npz")) / 1e6
+
+            t0 = time.perf_counter()
+            idx = ResumeIndex(d)
+            load = time.perf_counter() - t0
+
+            queries = rng.sample(tracks, min(args.queries, len(tracks)))
+            first, deep = [], []
+            for t in queries:
+                t0 = time.perf_counter()
+                top = idx.search(t["skills"], 0, args.per_page)
+                first.append(time.perf_counter() - t0)
+                t0 = time.perf_counter()
+                idx.search(t["skills"], 50 * args.per_page, args.per_page)
+                deep.append(time.perf_counter() - t0)
+
+            scan = ""
+            if n <= SCAN_LIMIT:
+                t = queries[0]
+                t0 = time.perf_counter()
+                expect = scan_top(rows, t["skills"], args.per_page)
+                scan = f"{(time.perf_counter() - t0) * 1000:.0f}"
+                if [r["id"] for r in idx.search(t["skills"], 0, args.per_page)["results"]] != expect:
+                    raise SystemExit(f"ranking mismatch at {n} resumes")
+
+            lat = sorted(first + deep)
+            print(f"{n:>9} {build:>8.2f} {save:>7.2f} {snap_mb:>8.1f} {load:>7.2f} "
+                  f"{statistics.median(first) * 1000:>7.2f} {statistics.median(lat) * 1000:>7.2f} "
+                  f"{lat[int(len(lat) * 0.99)] * 1000:>7.2f} {scan:>9}")
+
+
+if __name__ == "__main__":
+    main()
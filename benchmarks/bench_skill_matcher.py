@@ -0,0 +1,88 @@
+"""
+Compare the compiled token-trie matcher with the old per-skill regex loop.
+
+    python benchmarks/bench_skill_matcher.py
+    python benchmarks/bench_skill_matcher.py --sizes 1000 10000 --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from skill_extractor import SKILL_BANK, build_skill_trie, match_tokens, normalize_text  # noqa: E402
+
+
+def regex_loop(t: str, bank) -> list[str]:
+    # the extract_skills loop before the trie matcher
+    found = []
+    for skill in bank:
+        pattern = r"(^|\s)" + re.escape(skill) + r"(\s|$)"
+        if re.search(pattern, t):
+            found.append(skill)
+    return sorted(set(found))
+
+
+def make_bank(size: int, rng: random.Random) -> list[str]:
+    words = ["data", "cloud", "stream", "graph", "query", "edge", "mesh", "core",
+             "flow", "vector", "cache", "event", "model", "node", "sync", "auth"]
+    bank = set(SKILL_BANK)
+    while len(bank) < size:
+        n = rng.choice((1, 1, 2, 2, 3))
+        bank.add(" ".join(rng.choice(words) + str(rng.randrange(size)) for _ in range(n)))
+    return sorted(bank)
+
+
+def make_resume(bank, rng: random.Random, words: int = 1500) -> str:
+    filler = ["worked", "on", "team", "built", "shipped", "project", "using", "with",
+              "improved", "latency", "by", "30%", "and", "led", "migration", "to"]
+    out = []
+    while len(out) < words:
+        out.append(rng.choice(bank) if rng.random() < 0.08 else rng.choice(filler))
+    return " ".join(out)
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--words", type=int, default=1500)
+    args = ap.parse_args()
+
+    rng = random.Random(42)
+    print(f"{'bank':>8} {'build_ms':>10} {'regex_ms':>12} {'trie_ms':>10} {'speedup':>9}")
+    for size in args.sizes:
+        bank = make_bank(size, rng)
+        t = normalize_text(make_resume(bank, rng, args.words))
+
+        t0 = time.perf_counter()
+        trie = build_skill_trie(bank)
+        build = time.perf_counter() - t0
+
+        expected = regex_loop(t, bank)
+        got = sorted(match_tokens(t.split(" "), trie))
+        if got != expected:
+            raise SystemExit(f"mismatch on bank size {size}")
+
+        regex_s = best_of(lambda: regex_loop(t, bank), args.repeat)
+        trie_s = best_of(lambda: match_tokens(t.split(" "), trie), args.repeat)
+        print(f"{size:>8} {build * 1000:>10.1f} {regex_s * 1000:>12.1f} "
+              f"{trie_s * 1000:>10.2f} {regex_s / trie_s:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Worker startup cost: `python -X importtime -c "import app"` in fresh
+interpreters, the heaviest modules it pulls in, what warm_up() adds (paid
+once in the gunicorn master with preload), and the first request of a cold
+vs a warmed process.
+
+    python benchmarks/bench_startup.py --runs 5 --top 12
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LINE_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+HEAVY = ("groq", "PyPDF2", "sklearn", "joblib", "numpy", "scipy", "scipy.stats")
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+if {warm}:
+    app.warm_up()
+t2 = time.perf_counter()
+client = app.app.test_client()
+client.get("/")
+t3 = time.perf_counter()
+client.get("/")
+t4 = time.perf_counter()
+print(json.dumps({{"import": t1 - t0, "warm_up": t2 - t1, "first": t3 - t2, "second": t4 - t3,
+                  "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def importtime(runs: int) -> tuple[list[float], dict[str, int]]:
+    totals = []
+    direct: dict[str, list[int]] = {}
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"],
+                             cwd=ROOT, capture_output=True, text=True, check=True).stderr
+        children = []
+        for line in out.splitlines():
+            m = LINE_RE.match(line)
+            if not m:
+                continue
+            cumulative, depth, name = int(m.group(2)), len(m.group(3)), m.group(4)
+            # a module's imports are listed before it, one indent level deeper
+            if depth == 3:
+                children.append((name, cumulative))
+            elif depth == 1:
+                if name == "app":
+                    totals.append(cumulative / 1000)
+                    for child, us in children:
+                        direct.setdefault(child, []).append(us)
+                children = []
+    return totals, {k: int(statistics.median(v)) for k, v in direct.items()}
+
+
+def probe(warm: bool, runs: int) -> dict:
+    results = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", PROBE.format(warm=warm, heavy=HEAVY)],
+                             cwd=ROOT, capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(out.strip().splitlines()[-1]))
+    merged = {k: statistics.median(r[k] for r in results) for k in ("import", "warm_up", "first", "second")}
+    merged["loaded"] = results[-1]["loaded"]
+    return merged
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--top", type=int, default=12, help="heaviest direct imports of app to list")
+    args = ap.parse_args()
+
+    totals, direct = importtime(args.runs)
+    print(f"import app (-X importtime): median {statistics.median(totals):.0f} ms over {args.runs} runs")
+    print(f"\n{'module':<28} {'cumulative_ms':>14}")
+    for name, us in sorted(direct.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"{name:<28} {us / 1000:>14.1f}")
+
+    print(f"\n{'process':<10} {'import_ms':>10} {'warm_up_ms':>11} {'1st_req_ms':>11} {'2nd_req_ms':>11}  loaded")
+    for label, warm in (("cold", False), ("preload", True)):
+        r = probe(warm, args.runs)
+        print(f"{label:<10} {r['import'] * 1000:>10.0f} {r['warm_up'] * 1000:>11.0f} "
+              f"{r['first'] * 1000:>11.1f} {r['second'] * 1000:>11.1f}  {', '.join(r['loaded']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
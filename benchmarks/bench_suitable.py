@@ -0,0 +1,83 @@
+"""
+/suitable ranking: per-track match_score loop vs the precomputed TrackMatrix,
+and the weighted TfidfMatrix mode (fit once, then one sparse product per query).
+
+    python benchmarks/bench_suitable.py --tracks 100 1000 10000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from roles import flatten_all_tracks  # noqa: E402
+from scoring import TfidfMatrix, TrackMatrix, fit_skill_vectorizer, match_score  # noqa: E402
+from skill_extractor import SKILL_BANK  # noqa: E402
+
+
+def loop_top(tracks, detected, k=10):
+    # the /suitable loop before TrackMatrix
+    results = []
+    for item in tracks:
+        sc, _, _ = match_score(detected, item["skills"])
+        results.append({"title": item["title"], "path": item["path"], "role": item["role"],
+                        "category": item["category"], "track": item["track"], "score": sc})
+    results.sort(key=lambda x: x["score"], reverse=True)
+    return results[:k]
+
+
+def make_tracks(n: int, rng: random.Random):
+    base = flatten_all_tracks()
+    vocab = sorted({s for t in base for s in t["skills"]} | set(SKILL_BANK))
+    vocab += [f"skill {i}" for i in range(n)]
+    out = list(base)
+    while len(out) < n:
+        i = len(out)
+        out.append({"role": "Synthetic", "category": f"C{i // 50}", "track": f"T{i}",
+                    "title": f"Track {i}", "path": f"Synthetic → C{i // 50} → T{i}",
+                    "skills": rng.sample(vocab, rng.randrange(6, 20))})
+    return out
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tracks", type=int, nargs="+", default=[100, 1000, 10000])
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    rng = random.Random(7)
+    detected = rng.sample(SKILL_BANK, 25)
+    print(f"{'tracks':>8} {'build_ms':>10} {'loop_ms':>10} {'matrix_ms':>10} {'speedup':>9} "
+          f"{'tfidf_fit_ms':>13} {'tfidf_ms':>9}")
+    for n in args.tracks:
+        tracks = make_tracks(n, rng)
+        t0 = time.perf_counter()
+        tm = TrackMatrix(tracks)
+        build = time.perf_counter() - t0
+        if tm.top(detected, 10) != loop_top(tracks, detected, 10):
+            raise SystemExit(f"ranking mismatch at {n} tracks")
+        loop_s = timed(lambda: loop_top(tracks, detected), args.repeat)
+        mat_s = timed(lambda: tm.top(detected, 10), args.repeat)
+        t0 = time.perf_counter()
+        tf = TfidfMatrix(tracks, fit_skill_vectorizer(tracks))
+        fit = time.perf_counter() - t0
+        tf_s = timed(lambda: tf.top(detected, 10), args.repeat)
+        print(f"{n:>8} {build * 1000:>10.1f} {loop_s * 1000:>10.2f} {mat_s * 1000:>10.3f} "
+              f"{loop_s / mat_s:>8.0f}x {fit * 1000:>13.0f} {tf_s * 1000:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Worker memory under concurrent large uploads: peak RSS of a server process
+receiving N simultaneous /analyze uploads, reading each upload into memory
+("read", how /analyze worked before) vs spooling to a temp file and
+memory-mapping it ("mmap", the current path).
+
+    python benchmarks/bench_upload_memory.py --concurrency 1 4 16 --size-mb 8
+
+Each level starts a fresh server; every upload is a distinct PDF so the
+analysis cache never helps. Linux only (reads /proc/<pid>/status).
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import httpx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, HERE)
+
+from load_ask import free_port  # noqa: E402
+from synthetic import resume_pdf  # noqa: E402
+
+FORM = {"role": "Developer", "category": "Backend Developer", "track": "Java"}
+
+
+@contextmanager
+def _read_whole(stream):
+    # what /analyze did before: file.read() into one bytes object
+    stream.seek(0)
+    yield stream.read()
+
+
+def serve(mode: str, port: int) -> None:
+    from flask import Request
+    from werkzeug.serving import make_server
+
+    import app as web
+    from analysis_cache import AnalysisCache
+
+    web.analysis_cache = AnalysisCache(max_items=0)
+    if mode == "read":
+        web.app.request_class = Request
+        web.upload_buffer = _read_whole
+    make_server("127.0.0.1", port, web.app, threaded=True).serve_forever()
+
+
+def rss_mb(pid: int) -> dict[str, float]:
+    out = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "VmHWM"):
+                out[key] = int(value.split()[0]) / 1024
+    return out
+
+
+def run_level(mode: str, concurrency: int, pdfs: list[bytes]) -> dict[str, float]:
+    port = free_port()
+    proc = subprocess.Popen([sys.executable, __file__, "--serve", mode, "--port", str(port)], cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.time() + 30
+        while True:
+            try:
+                # warm-up: imports, templates, one small parse
+                httpx.post(f"{base}/analyze", data=FORM, timeout=30,
+                           files={"resume": ("warm.pdf", resume_pdf(1, 999), "application/pdf")})
+                break
+            except httpx.HTTPError:
+                if time.time() > deadline:
+                    raise SystemExit("server did not start")
+                time.sleep(0.2)
+        baseline = rss_mb(proc.pid)["VmRSS"]
+
+        def post(pdf: bytes) -> float:
+            t0 = time.perf_counter()
+            r = httpx.post(f"{base}/analyze", data=FORM, timeout=120,
+                           files={"resume": ("resume.pdf", pdf, "application/pdf")})
+            r.raise_for_status()
+            return time.perf_counter() - t0
+
+        with ThreadPoolExecutor(concurrency) as pool:
+            lat = list(pool.map(post, pdfs[:concurrency]))
+        peak = rss_mb(proc.pid)["VmHWM"]
+    finally:
+        proc.terminate()
+        proc.wait()
+    return {"baseline": baseline, "peak": peak, "per_req": (peak - baseline) / concurrency,
+            "p50_ms": statistics.median(lat) * 1000}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    ap.add_argument("--size-mb", type=float, default=8.0, help="upload size (text pages + a photo)")
+    ap.add_argument("--pages", type=int, default=5)
+    ap.add_argument("--mode", choices=["read", "mmap", "both"], default="both")
+    ap.add_argument("--serve", choices=["read", "mmap"], help=argparse.SUPPRESS)
+    ap.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+        return
+
+    photo = int(args.size_mb * 1024 * 1024)
+    pdfs = [resume_pdf(args.pages, seed, photo) for seed in range(max(args.concurrency))]
+    modes = ["read", "mmap"] if args.mode == "both" else [args.mode]
+    print(f"{len(pdfs[0]) / 1e6:.1f}MB uploads, {args.pages} pages each")
+    print(f"{'mode':<6} {'conc':>5} {'base_MB':>8} {'peak_MB':>8} {'per_req_MB':>11} {'p50_ms':>8}")
+    for n in args.concurrency:
+        for mode in modes:
+            r = run_level(mode, n, pdfs)
+            print(f"{mode:<6} {n:>5} {r['baseline']:>8.1f} {r['peak']:>8.1f} {r['per_req']:>11.1f} "
+                  f"{r['p50_ms']:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
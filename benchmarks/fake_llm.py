@@ -0,0 +1,149 @@
+"""
+Local stand-in for the Groq (OpenAI-compatible) chat completions API, for
+testing /ask and load-testing without a real key.
+
+    python benchmarks/fake_llm.py --port 8765 --first-token-delay 0.3 --chunk-delay 0.02
+    python benchmarks/fake_llm.py --error-rate 0.5 --jitter 2     # a struggling upstream
+    GROQ_API_KEY=fake GROQ_BASE_URL=http://127.0.0.1:8765 python app.py
+
+Answers "stream": true requests with chunked server-sent events and the rest
+with one JSON body after the same total delay. Runs on asyncio so thousands
+of slow responses can be in flight at once.
+
+Failure injection: error_rate of requests get an error_status response
+(after the first-token delay) and every request waits up to jitter extra
+seconds. The config returned by serve() can be changed while it runs.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+
+
+class FakeLLMConfig:
+    def __init__(self, first_token_delay: float = 0.2, chunk_delay: float = 0.02, chunks: int = 40,
+                 error_rate: float = 0.0, error_status: int = 503, jitter: float = 0.0):
+        self.first_token_delay = first_token_delay
+        self.chunk_delay = chunk_delay
+        self.chunks = chunks
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.jitter = jitter
+        self.requests = 0
+        self.errors = 0
+
+
+def _chunk(model: str, content: str | None, finish: str | None = None) -> dict:
+    delta = {"content": content} if content is not None else {}
+    return {"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": int(time.time()),
+            "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]}
+
+
+async def _write_chunk(writer: asyncio.StreamWriter, text: str) -> None:
+    data = text.encode()
+    writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+    await writer.drain()
+
+
+async def _respond(cfg: FakeLLMConfig, path: str, body: bytes, writer: asyncio.StreamWriter) -> None:
+    if not path.endswith("/chat/completions"):
+        writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\n\r\n")
+        return
+    cfg.requests += 1
+    req = json.loads(body or b"{}")
+    model = req.get("model", "fake")
+    words = [f"token{i} " for i in range(cfg.chunks)]
+    # rough count, like a real tokenizer's ~4 characters per token
+    prompt_tokens = sum(len(m.get("content") or "") for m in req.get("messages", [])) // 4
+
+    await asyncio.sleep(cfg.first_token_delay + random.uniform(0, cfg.jitter))
+    if random.random() < cfg.error_rate:
+        cfg.errors += 1
+        out = json.dumps({"error": {"message": "injected failure", "type": "server_error"}}).encode()
+        writer.write(f"HTTP/1.1 {cfg.error_status} Error\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(out)}\r\n\r\n".encode() + out)
+        return
+    if req.get("stream"):
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Transfer-Encoding: chunked\r\n\r\n")
+        for i, w in enumerate(words):
+            if i:
+                await asyncio.sleep(cfg.chunk_delay)
+            await _write_chunk(writer, f"data: {json.dumps(_chunk(model, w))}\n\n")
+        await _write_chunk(writer, f"data: {json.dumps(_chunk(model, None, 'stop'))}\n\n")
+        await _write_chunk(writer, "data: [DONE]\n\n")
+        writer.write(b"0\r\n\r\n")
+        return
+
+    await asyncio.sleep(cfg.chunk_delay * max(0, len(words) - 1))
+    out = json.dumps({
+        "id": "chatcmpl-fake", "object": "chat.completion", "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": "".join(words).strip()}}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(words),
+                  "total_tokens": prompt_tokens + len(words)},
+    }).encode()
+    writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                 + f"Content-Length: {len(out)}\r\n\r\n".encode() + out)
+
+
+def make_handler(cfg: FakeLLMConfig):
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:  # keep-alive
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode("latin1").split("\r\n")
+                path = lines[0].split(" ")[1]
+                length = 0
+                for line in lines[1:]:
+                    if line.lower().startswith("content-length:"):
+                        length = int(line.split(":", 1)[1])
+                body = await reader.readexactly(length) if length else b""
+                await _respond(cfg, path, body, writer)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    return handle
+
+
+def serve(host: str = "127.0.0.1", port: int = 0, cfg: FakeLLMConfig | None = None):
+    """Start the fake server on a background thread; returns (server, base_url, cfg)."""
+    cfg = cfg or FakeLLMConfig()
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(asyncio.start_server(make_handler(cfg), host, port, backlog=2048))
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return server, f"http://{host}:{server.sockets[0].getsockname()[1]}", cfg
+
+
+async def _main(args) -> None:
+    cfg = FakeLLMConfig(args.first_token_delay, args.chunk_delay, args.chunks,
+                        args.error_rate, args.error_status, args.jitter)
+    server = await asyncio.start_server(make_handler(cfg), args.host, args.port, backlog=2048)
+    print(f"fake LLM on http://{args.host}:{args.port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--first-token-delay", type=float, default=0.2)
+    ap.add_argument("--chunk-delay", type=float, default=0.02)
+    ap.add_argument("--chunks", type=int, default=40)
+    ap.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail")
+    ap.add_argument("--error-status", type=int, default=503)
+    ap.add_argument("--jitter", type=float, default=0.0, help="extra random latency, up to this many seconds")
+    asyncio.run(_main(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Concurrent /ask load test: sync WSGI (gunicorn) vs the async ASGI mode
+(uvicorn asgi:application), both against benchmarks/fake_llm.py.
+
+    python benchmarks/load_ask.py --concurrency 200 --requests 600
+    python benchmarks/load_ask.py --mode asgi --stream
+    python benchmarks/load_ask.py --guard --error-rate 0.5 --jitter 3   # degraded upstream
+
+Every request asks a different question so the answer cache never helps.
+Rate limits and the in-flight cap are off unless --guard is given (every
+request shares one session); "fallback" counts answers served without the LLM.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, HERE)
+
+from fake_llm import FakeLLMConfig, serve  # noqa: E402
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(mode: str, port: int, env: dict[str, str], workers: int) -> subprocess.Popen:
+    if mode == "wsgi":
+        cmd = [sys.executable, "-m", "gunicorn", "app:app", "-b", f"127.0.0.1:{port}",
+               "-w", str(workers), "--timeout", "120"]
+    else:
+        cmd = [sys.executable, "-m", "uvicorn", "asgi:application", "--port", str(port),
+               "--workers", str(workers), "--log-level", "warning"]
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.kill()
+    raise SystemExit(f"{mode} server did not start")
+
+
+async def fire(base: str, cookie: str, n: int, concurrency: int,
+               stream: bool) -> tuple[list[float], int, int, float]:
+    sem = asyncio.Semaphore(concurrency)
+    lat: list[float] = []
+    errors = fallbacks = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base, cookies={"session": cookie}, limits=limits,
+                                 timeout=300) as client:
+        async def one(i: int) -> None:
+            nonlocal errors, fallbacks
+            async with sem:
+                t0 = time.perf_counter()
+                try:
+                    r = await client.post("/ask", json={"q": f"question number {i}", "stream": stream})
+                    if r.status_code != 200 or (stream and '"done"' not in r.text):
+                        errors += 1
+                    elif '"fallback"' in r.text:
+                        fallbacks += 1
+                except httpx.HTTPError:
+                    errors += 1
+                lat.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(n)))
+        return lat, errors, fallbacks, time.perf_counter() - t0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mode", choices=["wsgi", "asgi", "both"], default="both")
+    ap.add_argument("--requests", type=int, default=400)
+    ap.add_argument("--concurrency", type=int, default=200)
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--stream", action="store_true")
+    ap.add_argument("--llm-delay", type=float, default=0.5, help="fake time to first token")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="fraction of fake LLM calls that fail")
+    ap.add_argument("--jitter", type=float, default=0.0, help="extra random fake LLM latency (s)")
+    ap.add_argument("--guard", action="store_true", help="keep the LLM rate limits / in-flight cap on")
+    args = ap.parse_args()
+
+    _, llm_url, cfg = serve(cfg=FakeLLMConfig(args.llm_delay, 0.005, 20, error_rate=args.error_rate,
+                                              jitter=args.jitter))
+    db = os.path.join(tempfile.mkdtemp(), "analyses.db")
+    env = dict(os.environ, GROQ_API_KEY="fake", GROQ_BASE_URL=llm_url,
+               ANALYSIS_STORE=f"sqlite:///{db}", FLASK_SECRET_KEY="load-test")
+    if not args.guard:
+        for name in ("LLM_RATE", "LLM_SESSION_RATE", "LLM_MAX_IN_FLIGHT"):
+            env.setdefault(name, "0")
+    os.environ.update(env)
+
+    # one stored analysis + a signed session cookie pointing at it
+    import app as web
+    web.analysis_store.put("load", {
+        "title": "Java Backend Developer", "path": "Developer → Backend Developer → Java", "score": 40,
+        "blueprint": ["java", "docker"], "detected": ["java"], "matched": ["java"],
+        "missing": ["docker"], "preview": "",
+    })
+    cookie = web.app.session_interface.get_signing_serializer(web.app).dumps({"analysis_id": "load"})
+
+    modes = ["wsgi", "asgi"] if args.mode == "both" else [args.mode]
+    for mode in modes:
+        port = free_port()
+        proc = start_server(mode, port, env, args.workers)
+        try:
+            lat, errors, fallbacks, wall = asyncio.run(
+                fire(f"http://127.0.0.1:{port}", cookie, args.requests, args.concurrency, args.stream))
+        finally:
+            proc.terminate()
+            proc.wait()
+        lat.sort()
+        print(f"{mode}: {args.requests / wall:7.1f} req/s  p50 {statistics.median(lat) * 1000:7.0f} ms  "
+              f"p95 {lat[int(len(lat) * 0.95) - 1] * 1000:7.0f} ms  errors {errors}  fallback {fallbacks}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Benchmark suite for the analyze pipeline.
+
+Micro-benchmarks for each stage (PDF parse, normalize_text, extract_skills,
+section rescans of an edited resume, match_score, build_roadmap_for_role, /suitable ranking) across resume size
+tiers, plus an end-to-end /analyze -> /suitable -> /roadmap run through the
+Flask test client.
+
+    python benchmarks/run.py                          # print results
+    python benchmarks/run.py -o results.json          # machine-readable output
+    python benchmarks/run.py --save-baseline          # refresh benchmarks/baseline.json
+    python benchmarks/run.py --compare                # fail (exit 1) on >25% regressions
+    python benchmarks/run.py --only extract_skills --tiers small large
+
+Baselines are machine-specific: save one on the machine you compare on.
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+import app as web  # noqa: E402
+from analysis_cache import AnalysisCache  # noqa: E402
+from resume_parser import extract_text_from_pdf, prescreen_pdf  # noqa: E402
+from roles import build_roadmap_for_role, flatten_all_tracks  # noqa: E402
+from scoring import match_score  # noqa: E402
+from sections import SectionScanner, known_chunks  # noqa: E402
+from skill_extractor import extract_skills, normalize_text  # noqa: E402
+from synthetic import TIERS, resume_pages, resume_pdf, resume_text  # noqa: E402
+
+BASELINE = os.path.join(HERE, "baseline.json")
+
+
+def measure(fn: Callable[[], object], repeat: int, target: float = 0.05) -> dict[str, float]:
+    # calibrate the inner loop so each sample takes ~target seconds
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - t0 >= target or number >= 1 << 16:
+            break
+        number *= 2
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - t0) / number)
+    return {
+        "median_us": round(statistics.median(samples) * 1e6, 2),
+        "min_us": round(min(samples) * 1e6, 2),
+        "loops": number,
+    }
+
+
+def build_cases(tiers: list[str]) -> dict[str, Callable[[], object]]:
+    cases: dict[str, Callable[[], object]] = {}
+    tracks = flatten_all_tracks()
+
+    for tier in tiers:
+        pages = TIERS[tier]
+        text = resume_text(pages, seed=pages)
+        pdf = resume_pdf(pages, seed=pages)
+        detected = extract_skills(text)
+        detected_set = set(detected)
+
+        cases[f"prescreen[{tier}]"] = lambda pdf=pdf: prescreen_pdf(pdf)
+        cases[f"pdf_parse[{tier}]"] = lambda pdf=pdf: extract_text_from_pdf(io.BytesIO(pdf))
+        cases[f"normalize_text[{tier}]"] = lambda text=text: normalize_text(text)
+        cases[f"extract_skills[{tier}]"] = lambda text=text: extract_skills(text)
+        # re-upload with one line added to the last page: every chunk vs only the changed one
+        page_texts = resume_pages(pages, seed=pages)
+        edited = page_texts[:-1] + [page_texts[-1] + "\nkafka airflow"]
+        known = known_chunks(scan_sections(page_texts).sections)
+        cases[f"section_scan_full[{tier}]"] = lambda p=edited: scan_sections(p)
+        cases[f"section_scan_edited[{tier}]"] = lambda p=edited, k=known: scan_sections(p, k)
+        cases[f"match_score_all_tracks[{tier}]"] = lambda d=detected: [
+            match_score(d, t["skills"]) for t in tracks]
+        cases[f"roadmap_all_tracks[{tier}]"] = lambda d=detected_set: [
+            build_roadmap_for_role(t["role"], t["category"], t["track"], d) for t in tracks]
+        cases[f"suitable_rank[{tier}]"] = lambda d=detected: web.track_matrix().top(d, 10)
+        cases[f"e2e_analyze_suitable_roadmap[{tier}]"] = lambda pdf=pdf: e2e(pdf)
+        # comparing every track: /analyze once per track vs one /compare
+        cases[f"e2e_analyze_each_track[{tier}]"] = lambda pdf=pdf: [analyze_one(pdf, t) for t in tracks]
+        cases[f"e2e_compare_all_tracks[{tier}]"] = lambda pdf=pdf: compare_all(pdf)
+    return cases
+
+
+def scan_sections(pages: list[str], known=None) -> SectionScanner:
+    scanner = SectionScanner(known)
+    for page in pages:
+        scanner.feed(page)
+    scanner.finish()
+    return scanner
+
+
+def analyze_one(pdf: bytes, track) -> None:
+    r = web.app.test_client().post("/analyze", data={
+        "role": track["role"], "category": track["category"], "track": track["track"],
+        "resume": (io.BytesIO(pdf), "resume.pdf"),
+    }, content_type="multipart/form-data")
+    assert r.status_code == 200
+
+
+def compare_all(pdf: bytes) -> None:
+    r = web.app.test_client().post("/compare", data={
+        "track": "all", "resume": (io.BytesIO(pdf), "resume.pdf"),
+    }, content_type="multipart/form-data")
+    assert r.status_code == 200
+
+
+def e2e(pdf: bytes) -> None:
+    client = web.app.test_client()
+    r = client.post("/analyze", data={
+        "role": "Developer", "category": "Backend Developer", "track": "Java",
+        "resume": (io.BytesIO(pdf), "resume.pdf"),
+    }, content_type="multipart/form-data")
+    assert r.status_code == 200
+    assert client.get("/suitable").status_code == 200
+    assert client.get("/roadmap").status_code == 200
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    regressions = []
+    print(f"\n{'benchmark':<44} {'baseline_us':>12} {'now_us':>12} {'change':>8}")
+    for name, now in results.items():
+        base = baseline.get(name)
+        if not base:
+            print(f"{name:<44} {'-':>12} {now['median_us']:>12.1f} {'new':>8}")
+            continue
+        ratio = now["median_us"] / base["median_us"] if base["median_us"] else 1.0
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<44} {base['median_us']:>12.1f} {now['median_us']:>12.1f} "
+              f"{(ratio - 1) * 100:>+7.1f}%{flag}")
+    return regressions
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tiers", nargs="+", choices=list(TIERS), default=list(TIERS))
+    ap.add_argument("--only", nargs="+", default=[], help="substrings of benchmark names to run")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("-o", "--out", help="write results JSON here")
+    ap.add_argument("--save-baseline", action="store_true")
+    ap.add_argument("--compare", action="store_true")
+    ap.add_argument("--baseline", default=BASELINE)
+    ap.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, 0.25 = 25%%")
+    args = ap.parse_args()
+
+    # measure the real work, not the upload cache
+    web.analysis_cache = AnalysisCache(max_items=0)
+
+    cases = build_cases(args.tiers)
+    if args.only:
+        cases = {k: v for k, v in cases.items() if any(s in k for s in args.only)}
+
+    results = {}
+    for name, fn in cases.items():
+        results[name] = measure(fn, args.repeat)
+        print(f"{name:<44} {results[name]['median_us']:>12.1f} us", flush=True)
+
+    doc = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2)
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f).get("results", {})
+        doc["results"] = {**baseline, **results}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=2)
+            f.write("\n")
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            print(f"no baseline at {args.baseline}; run with --save-baseline first")
+            return 2
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
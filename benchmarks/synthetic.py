@@ -0,0 +1,82 @@
+"""
+Synthetic resumes for benchmarks: plain text and minimal text PDFs
+(Helvetica, no external PDF library needed) across size tiers.
+"""
+from __future__ import annotations
+
+import random
+import textwrap
+
+from skill_extractor import ALIASES, SKILL_BANK
+
+# pages of text per tier
+TIERS = {"small": 1, "medium": 5, "large": 50}
+
+_FILLER = (
+    "designed built shipped owned improved reduced latency throughput team led migrated "
+    "service platform pipeline customers internal stakeholders delivered project release "
+    "production incidents on-call metrics dashboards roadmap quarter mentoring reviews"
+).split()
+
+
+def resume_pages(pages: int = 1, seed: int = 0, words_per_page: int = 450) -> list[str]:
+    rng = random.Random(seed)
+    skills = list(SKILL_BANK) + list(ALIASES)
+    out = []
+    for p in range(pages):
+        words = []
+        while len(words) < words_per_page:
+            words.append(rng.choice(skills) if rng.random() < 0.1 else rng.choice(_FILLER))
+        out.append(f"Experience {p + 1}\n" + " ".join(words) + ".")
+    return out
+
+
+def resume_text(pages: int = 1, seed: int = 0) -> str:
+    return "\n".join(resume_pages(pages, seed))
+
+
+def _escape(s: str) -> str:
+    return s.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages: list[str], photo_bytes: int = 0, seed: int = 0) -> bytes:
+    """
+    One PDF page per string, wrapped to ~90 columns. photo_bytes > 0 adds an
+    incompressible image of that size to the first page (a profile photo
+    or scanned logo), for upload-size tests.
+    """
+    photo_obj = 4 + 2 * len(pages)
+    objs = [b"<< /Type /Catalog /Pages 2 0 R >>"]
+    kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(len(pages)))
+    objs.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+    objs.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    for i, text in enumerate(pages):
+        xobject = f" /XObject << /Im1 {photo_obj} 0 R >>" if photo_bytes and i == 0 else ""
+        objs.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >>{xobject} >> /Contents {5 + 2 * i} 0 R >>".encode()
+        )
+        lines = textwrap.wrap(text, 90) or [""]
+        body = "BT /F1 9 Tf 36 760 Td 11 TL " + " ".join(f"({_escape(l)}) '" for l in lines) + " ET"
+        raw = body.encode("latin-1", "replace")
+        objs.append(b"<< /Length %d >>\nstream\n" % len(raw) + raw + b"\nendstream")
+    if photo_bytes:
+        side = int(photo_bytes ** 0.5)
+        raw = random.Random(seed).randbytes(side * side)
+        objs.append(b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray "
+                    b"/BitsPerComponent 8 /Length %d >>\nstream\n" % (side, side, len(raw)) + raw + b"\nendstream")
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for i, obj in enumerate(objs):
+        offsets.append(len(out))
+        out += f"{i + 1} 0 obj\n".encode() + obj + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{o:010d} 00000 n \n".encode() for o in offsets)
+    out += f"trailer\n<< /Size {len(objs) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+def resume_pdf(pages: int = 1, seed: int = 0, photo_bytes: int = 0) -> bytes:
+    return make_pdf(resume_pages(pages, seed), photo_bytes, seed)
@@ -0,0 +1,46 @@
+"""
+Rendered template fragments that only depend on the role catalog (dropdown
+options, track headings, roadmap step tags), kept per catalog version so a
+page render pastes them in instead of re-rendering the same markup.
+"""
+from __future__ import annotations
+
+import threading
+from typing import Any, Callable, Hashable
+
+from markupsafe import Markup
+
+
+class FragmentCache:
+    """(name, args) -> Markup for one catalog version; a new version drops everything."""
+
+    def __init__(self, max_items: int = 4096):
+        self.max_items = max_items
+        # swapped as one tuple so a reader never pairs a version with another version's fragments
+        self._entries: tuple[str | None, dict[Hashable, Markup]] = (None, {})
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0}
+
+    def get(self, version: str, key: Hashable, render: Callable[[], Any]) -> Markup:
+        current, data = self._entries
+        if current == version:
+            out = data.get(key)
+            if out is not None:
+                self.counters["hits"] += 1
+                return out
+        out = Markup(render())
+        with self._lock:
+            self.counters["misses"] += 1
+            current, data = self._entries
+            if current != version:
+                data = {}
+                self._entries = (version, data)
+            if len(data) < self.max_items:
+                data[key] = out
+        return out
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            out: dict[str, Any] = dict(self.counters)
+            out["items"] = len(self._entries[1])
+        return out
@@ -0,0 +1,31 @@
+# Picked up automatically by `gunicorn app:app` (see Procfile).
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+# threaded workers so one slow /ask or PDF upload doesn't block the whole process
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS", "8"))
+
+# a per-process store would send each worker's sessions to a different dict
+if workers > 1 and os.environ.get("ANALYSIS_STORE", "").strip() == "memory":
+    raise SystemExit("ANALYSIS_STORE=memory only works with one worker (WEB_CONCURRENCY=1); use sqlite:///…")
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
+
+# Import the app and build the catalog indexes, skill matcher and /suitable
+# matrix once in the master; workers are forked already warm.
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") != "0"
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    from app import warm_up
+
+    warm_up()
+    # keep the preloaded objects out of the collector so workers don't touch
+    # (and copy) the shared pages when they collect
+    gc.freeze()
@@ -0,0 +1,135 @@
+"""
+Background analysis jobs: the upload is accepted at once and analyzed on a
+small local thread pool, with no external broker.
+
+Job records live in the analysis store under "job:<id>", so with the SQLite
+store any worker can answer a status poll, not only the one running the job.
+Concurrency is bounded by the pool size, and at most workers + max_queued
+jobs are accepted at a time (submit raises QueueFull past that).
+Threads can't be killed, so a job past its timeout is reported as failed
+and whatever it returns later is discarded.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+TERMINAL = ("done", "failed")
+
+
+class QueueFull(RuntimeError):
+    """Every worker is busy and the queue is at capacity."""
+
+
+class JobQueue:
+    def __init__(self, store, workers: int = 2, max_queued: int = 32, timeout: float = 60):
+        self.store = store
+        self.workers = workers
+        self.max_queued = max_queued
+        self.timeout = timeout
+        self._pool: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._accepted = 0
+        self._events: dict[str, threading.Event] = {}
+        self.counters = {"submitted": 0, "rejected": 0, "done": 0, "failed": 0, "timed_out": 0}
+        os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _reset_after_fork(self) -> None:
+        # the pool's threads and any in-flight jobs stay with the parent
+        self._pool = None
+        self._lock = threading.Lock()
+        self._accepted = 0
+        self._events = {}
+
+    def _key(self, job_id: str) -> str:
+        return f"job:{job_id}"
+
+    def _save(self, job_id: str, record: dict[str, Any]) -> None:
+        self.store.put(self._key(job_id), record)
+
+    def submit(self, fn: Callable[..., dict[str, Any]], *args: Any, **meta: Any) -> str:
+        """Queue fn(*args); its return value becomes the job's "result". meta is kept on the record."""
+        with self._lock:
+            if self._accepted >= self.workers + self.max_queued:
+                self.counters["rejected"] += 1
+                raise QueueFull(f"{self._accepted} jobs in progress")
+            self._accepted += 1
+            self.counters["submitted"] += 1
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+            pool = self._pool
+            job_id = uuid.uuid4().hex
+            self._events[job_id] = threading.Event()
+        self._save(job_id, {"status": "queued", "created": time.time(), **meta})
+        pool.submit(self._run, job_id, fn, args, meta)
+        return job_id
+
+    def _run(self, job_id: str, fn, args, meta) -> None:
+        started = time.time()
+        record = {"status": "running", "created": started, "started": started,
+                  "deadline": started + self.timeout, **meta}
+        timed_out = False
+        try:
+            old = self.store.get(self._key(job_id))
+            if old:
+                record["created"] = old.get("created", started)
+            self._save(job_id, record)
+            try:
+                result = fn(*args)
+            except Exception as e:
+                record.update(status="failed", error=str(e), error_code=getattr(e, "code", "error"))
+            else:
+                record.update(status="done", result=result)
+            record["finished"] = time.time()
+            if record["finished"] > record["deadline"]:
+                # status() has already been reporting a timeout; don't flip it back
+                record.update(status="failed", error="Analysis timed out.", error_code="timeout")
+                record.pop("result", None)
+                timed_out = True
+            self._save(job_id, record)
+        finally:
+            with self._lock:
+                if "finished" in record:
+                    if timed_out:
+                        self.counters["timed_out"] += 1
+                    self.counters[record["status"]] += 1
+                self._accepted -= 1
+                event = self._events.pop(job_id, None)
+            if event is not None:
+                event.set()
+
+    def status(self, job_id: str) -> dict[str, Any] | None:
+        record = self.store.get(self._key(job_id))
+        if record is None:
+            return None
+        if record["status"] == "running" and time.time() > record.get("deadline", float("inf")):
+            record = {**record, "status": "failed", "error": "Analysis timed out.", "error_code": "timeout"}
+        return record
+
+    def wait(self, job_id: str, timeout: float) -> dict[str, Any] | None:
+        """status(), after waiting up to timeout seconds for the job to finish (long polling)."""
+        end = time.monotonic() + timeout
+        event = self._events.get(job_id)
+        if event is not None:
+            # ours: sleep until it finishes (or its deadline passes)
+            record = self.status(job_id)
+            limit = end - time.monotonic()
+            if record and record.get("deadline"):
+                limit = min(limit, record["deadline"] - time.time() + 0.05)
+            event.wait(max(limit, 0))
+            return self.status(job_id)
+        # running in another worker process: poll the shared store
+        while True:
+            record = self.status(job_id)
+            if record is None or record["status"] in TERMINAL or time.monotonic() >= end:
+                return record
+            time.sleep(min(0.25, max(end - time.monotonic(), 0)))
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {**self.counters, "in_progress": self._accepted,
+                    "capacity": self.workers + self.max_queued}
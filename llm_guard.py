@@ -0,0 +1,194 @@
+"""
+Admission control for LLM calls, so a slow or failing upstream can't tie up
+every worker.
+
+Before each upstream call, LLMGuard checks:
+- a circuit breaker, which opens after a run of failures and lets a single
+  probe through once the cool-down has passed
+- a cap on calls in flight
+- a per-session token bucket and a global one
+
+Every check fails fast with LLMUnavailable, and the caller answers without
+the LLM. Limits are per process, so with N workers the fleet-wide rate is N
+times the configured one.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+UNAVAILABLE_MESSAGES = {
+    "circuit_open": "AI is temporarily unavailable, here is a quick answer instead.",
+    "rate_limited": "AI is handling a lot of questions right now, here is a quick answer instead.",
+    "session_rate_limited": "You're asking faster than the AI allows, here is a quick answer instead.",
+    "busy": "AI is busy right now, here is a quick answer instead.",
+}
+
+
+class LLMUnavailable(RuntimeError):
+    """The guard refused the call. `code` is one of UNAVAILABLE_MESSAGES."""
+
+    def __init__(self, code: str):
+        super().__init__(UNAVAILABLE_MESSAGES[code])
+        self.code = code
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `burst`; rate <= 0 never limits."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+
+    def take(self, now: float | None = None) -> bool:
+        # callers hold the guard's lock
+        if self.rate <= 0:
+            return True
+        now = time.monotonic() if now is None else now
+        self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        return False
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failures` consecutive failures; open -> half_open
+    once `reset_after` seconds have passed, letting a single probe through;
+    the probe closes the breaker again or re-opens it.
+    """
+
+    def __init__(self, failures: int = 5, reset_after: float = 30.0):
+        self.failures = failures
+        self.reset_after = reset_after
+        self.state = "closed"
+        self._failed = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    def blocked(self, now: float) -> bool:
+        # open and still cooling down: refuse before spending any rate tokens
+        return self.state == "open" and now - self._opened_at < self.reset_after
+
+    def allow(self, now: float) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            if now - self._opened_at < self.reset_after:
+                return False
+            self.state = "half_open"
+        if self._probing:
+            return False
+        self._probing = True
+        return True
+
+    def success(self) -> None:
+        self.state = "closed"
+        self._failed = 0
+        self._probing = False
+
+    def abandon(self) -> None:
+        # the call ended without a verdict: let the next one probe
+        self._probing = False
+
+    def failure(self, now: float) -> None:
+        self._failed += 1
+        self._probing = False
+        if self.state == "half_open" or self._failed >= self.failures:
+            self.state = "open"
+            self._opened_at = now
+
+
+class LLMGuard:
+    def __init__(self, rate: float = 20.0, burst: float = 40.0, session_rate: float = 0.5,
+                 session_burst: float = 5.0, max_in_flight: int = 16, timeout: float = 30.0,
+                 breaker_failures: int = 5, breaker_reset: float = 30.0, max_sessions: int = 10000):
+        self.timeout = timeout  # per upstream call, passed on by the caller
+        self.max_in_flight = max_in_flight
+        self.session_rate = session_rate
+        self.session_burst = session_burst
+        self.max_sessions = max_sessions
+        self.breaker = CircuitBreaker(breaker_failures, breaker_reset)
+        self._bucket = TokenBucket(rate, burst)
+        self._sessions: OrderedDict[str, TokenBucket] = OrderedDict()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self.counters = {"calls": 0, "failures": 0, "circuit_open": 0, "rate_limited": 0,
+                         "session_rate_limited": 0, "busy": 0}
+
+    def _admit(self, session: str | None) -> None:
+        now = time.monotonic()
+        with self._lock:
+            code = None
+            if self.breaker.blocked(now):
+                code = "circuit_open"
+            elif self._in_flight >= self.max_in_flight > 0:
+                code = "busy"
+            elif session and not self._session_bucket(session).take(now):
+                code = "session_rate_limited"
+            elif not self._bucket.take(now):
+                code = "rate_limited"
+            # after the other checks, so a call they refuse doesn't use up the half-open probe
+            elif not self.breaker.allow(now):
+                code = "circuit_open"
+            if code is not None:
+                self.counters[code] += 1
+                raise LLMUnavailable(code)
+            self._in_flight += 1
+            self.counters["calls"] += 1
+
+    def _session_bucket(self, session: str) -> TokenBucket:
+        bucket = self._sessions.get(session)
+        if bucket is None:
+            bucket = self._sessions[session] = TokenBucket(self.session_rate, self.session_burst)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(session)
+        return bucket
+
+    def _release(self, ok: bool | None) -> None:
+        """ok=None: the caller went away mid-call, which says nothing about upstream health."""
+        now = time.monotonic()
+        with self._lock:
+            self._in_flight -= 1
+            if ok:
+                self.breaker.success()
+            elif ok is False:
+                self.counters["failures"] += 1
+                self.breaker.failure(now)
+            else:
+                self.breaker.abandon()
+
+    @contextmanager
+    def call(self, session: str | None = None) -> Iterator[None]:
+        """
+        Wrap one upstream call (or a whole streamed response). Raises
+        LLMUnavailable without calling upstream when the call is refused; an
+        exception inside the block counts as an upstream failure.
+        """
+        self._admit(session)
+        ok = None
+        try:
+            yield
+            ok = True
+        except Exception:
+            ok = False
+            raise
+        finally:
+            self._release(ok)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            out: dict[str, Any] = dict(self.counters)
+            out["in_flight"] = self._in_flight
+            out["circuit_open_now"] = int(self.breaker.state != "closed")
+            out["sessions"] = len(self._sessions)
+        return out
@@ -0,0 +1,143 @@
+"""
+Minimal in-process metrics: latency histograms, counters and gauges rendered
+in the Prometheus text format for /metrics. Each worker process keeps its own
+numbers, so scrape every worker (or run one) when using several.
+"""
+from __future__ import annotations
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable
+
+# seconds; PDF parsing and LLM calls go well past the usual web buckets
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# which route a stage timing belongs to (set per request by the app)
+current_route: contextvars.ContextVar[str] = contextvars.ContextVar("current_route", default="")
+
+_lock = threading.Lock()
+
+
+def _escape(v) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in sorted(labels.items())) + "}"
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple, list] = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            s = self._series.get(key)
+            if s is None:
+                s = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, b in enumerate(self.buckets):
+                if value <= b:
+                    s[i] += 1
+            s[-2] += value
+            s[-1] += 1
+
+    def render(self) -> list[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with _lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        for key, s in sorted(series.items()):
+            labels = dict(key)
+            for i, b in enumerate(self.buckets):
+                out.append(f"{self.name}_bucket{_labels({**labels, 'le': repr(float(b))})} {s[i]}")
+            out.append(f"{self.name}_bucket{_labels({**labels, 'le': '+Inf'})} {s[-1]}")
+            out.append(f"{self.name}_sum{_labels(labels)} {s[-2]:.6f}")
+            out.append(f"{self.name}_count{_labels(labels)} {s[-1]}")
+        return out
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._series: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        with _lock:
+            return self._series.get(tuple(sorted(labels.items())), 0)
+
+    def render(self) -> list[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with _lock:
+            series = dict(self._series)
+        for key, v in sorted(series.items()):
+            out.append(f"{self.name}{_labels(dict(key))} {v:g}")
+        return out
+
+
+REQUEST_SECONDS = Histogram("resume_request_seconds", "Request latency by route.")
+STAGE_SECONDS = Histogram("resume_stage_seconds", "Time spent in each pipeline stage.")
+PDF_PAGES = Counter("resume_pdf_pages_total", "PDF pages extracted.")
+PDF_BYTES = Counter("resume_pdf_bytes_total", "Uploaded PDF bytes processed.")
+SLOW_PROFILES = Counter("resume_slow_request_profiles_total", "cProfile dumps written for slow requests.")
+UPLOAD_REJECTS = Counter("resume_upload_rejects_total", "Uploads rejected before or during parsing, by reason.")
+SECTION_CHUNKS = Counter("resume_section_chunks_total",
+                         "Resume page/section chunks, by whether they were rescanned or reused from the last analysis.")
+PROMPT_TOKENS = Histogram("resume_ask_prompt_tokens",
+                          "Prompt tokens per /ask upstream call: local estimate, and as reported by the provider.",
+                          buckets=(128, 256, 512, 768, 1024, 1536, 2048, 4096, 8192))
+
+_metrics: list[Any] = [REQUEST_SECONDS, STAGE_SECONDS, PDF_PAGES, PDF_BYTES, SLOW_PROFILES, UPLOAD_REJECTS,
+                     SECTION_CHUNKS, PROMPT_TOKENS]
+_collectors: list[tuple[str, Callable[[], dict[str, Any]]]] = []
+
+
+def register(metric) -> Any:
+    _metrics.append(metric)
+    return metric
+
+
+def register_collector(prefix: str, fn: Callable[[], dict[str, Any]]) -> None:
+    """Export every numeric value of fn() (e.g. a cache's stats()) as a gauge named prefix_key."""
+    _collectors.append((prefix, fn))
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    STAGE_SECONDS.observe(seconds, route=current_route.get(), stage=stage)
+
+
+@contextmanager
+def timer(stage: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - t0)
+
+
+def render_prometheus() -> str:
+    lines: list[str] = []
+    for m in _metrics:
+        lines.extend(m.render())
+    for prefix, fn in _collectors:
+        try:
+            values = fn()
+        except Exception:
+            continue
+        for k, v in sorted(values.items()):
+            if isinstance(v, (int, float)) and not isinstance(v, bool):
+                lines.append(f"# TYPE {prefix}_{k} gauge")
+                lines.append(f"{prefix}_{k} {v:g}")
+    return "\n".join(lines) + "\n"
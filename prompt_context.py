@@ -0,0 +1,136 @@
+"""
+System prompt for /ask, built within a token budget.
+
+The prompt is assembled from the stored analysis. If the estimated size is
+over budget, the lowest-priority parts are shrunk first, in this order:
+1. the resume preview
+2. the blueprint, which is just matched + missing
+3. detected skills outside the blueprint
+4. long matched lists
+5. long missing lists
+
+Analyses never change once stored, so each prompt is cached by analysis id.
+The same analysis then costs one dict lookup per question.
+"""
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any
+
+RULES = """Rules:
+- Be crisp, no fluff. Use short headings + bullets.
+- If user asks what to learn next: prioritize missing skills, give a step-by-step plan.
+- If user asks interview prep: give role-specific Qs + strong answers + common mistakes.
+- If user asks projects: suggest 2–3 projects tailored to the role (stack, features, metrics, resume bullets).
+- If user asks resume improvements: give ATS-friendly bullet rewrites + missing keywords.
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English prose and skill lists; no tokenizer needed
+    return (len(text) + 3) // 4
+
+
+def _capped(items: list[str], limit: int | None) -> str:
+    if limit is None or len(items) <= limit:
+        return ", ".join(items)
+    return ", ".join(items[:limit]) + f" (+{len(items) - limit} more)"
+
+
+def render_prompt(data: dict[str, Any], preview_chars: int | None = None, blueprint: bool = True,
+                  detected_limit: int | None = None, matched_limit: int | None = None,
+                  missing_limit: int | None = None) -> str:
+    """The /ask system prompt; with every argument left at its default, nothing is dropped."""
+    title = data.get("title", "Selected Role")
+    path = data.get("path", "")
+    score = data.get("score", 0)
+    detected = data.get("detected", [])
+    matched = data.get("matched", [])
+    missing = data.get("missing", [])
+    preview = data.get("preview", "")
+
+    lines = [
+        "",
+        "You are an expert IT career mentor + hiring manager.",
+        "Answer the user's question about the selected role in a practical, accurate, structured way.",
+        "",
+        f"Selected role: {title}",
+        f"Path: {path}",
+        f"Resume match score: {score}%",
+        "",
+    ]
+    if blueprint:
+        lines.append(f"Role blueprint skills (target): {', '.join(data.get('blueprint', []))}")
+    if detected_limit is None:
+        lines.append(f"Detected in resume: {', '.join(detected)}")
+    else:
+        # matched already lists the detected blueprint skills; keep only the rest
+        in_blueprint = set(matched) | set(missing)
+        lines.append(f"Other skills in resume: {_capped([s for s in detected if s not in in_blueprint], detected_limit)}")
+    lines.append(f"Matched: {_capped(matched, matched_limit)}")
+    lines.append(f"Missing: {_capped(missing, missing_limit)}")
+    lines.append("")
+    if preview_chars is None or preview_chars > 0:
+        lines.append("Resume preview (partial):")
+        lines.append(preview if preview_chars is None else preview[:preview_chars])
+        lines.append("")
+    lines.append(RULES)
+    return "\n".join(lines)
+
+
+# progressively smaller prompts, tried in order until one fits the budget
+_STEPS: list[dict[str, Any]] = [
+    {},
+    {"preview_chars": 300},
+    {"preview_chars": 0},
+    {"preview_chars": 0, "blueprint": False},
+    {"preview_chars": 0, "blueprint": False, "detected_limit": 20},
+    {"preview_chars": 0, "blueprint": False, "detected_limit": 0, "matched_limit": 25},
+    {"preview_chars": 0, "blueprint": False, "detected_limit": 0, "matched_limit": 10, "missing_limit": 40},
+    {"preview_chars": 0, "blueprint": False, "detected_limit": 0, "matched_limit": 5, "missing_limit": 15},
+]
+
+
+class PromptBuilder:
+    def __init__(self, budget: int = 800, max_items: int = 2048):
+        """budget: estimated tokens for the system prompt (<= 0 disables trimming)."""
+        self.budget = budget
+        self.max_items = max_items
+        self._cache: OrderedDict[str, tuple[str, int, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "trimmed": 0}
+
+    def system_prompt(self, data: dict[str, Any], key: str | None = None) -> tuple[str, int]:
+        """(prompt, estimated tokens); key is the analysis id, None skips the cache."""
+        if key is not None:
+            with self._lock:
+                hit = self._cache.get(key)
+                if hit is not None:
+                    self._cache.move_to_end(key)
+                    self.counters["hits"] += 1
+                    return hit[0], hit[1]
+
+        steps = _STEPS if self.budget > 0 else _STEPS[:1]
+        for level, step in enumerate(steps):
+            prompt = render_prompt(data, **step)
+            tokens = estimate_tokens(prompt)
+            if tokens <= self.budget or self.budget <= 0:
+                break
+        # still over after the last step: send the smallest version anyway
+
+        with self._lock:
+            self.counters["misses"] += 1
+            if level:
+                self.counters["trimmed"] += 1
+            if key is not None:
+                self._cache[key] = (prompt, tokens, level)
+                while len(self._cache) > self.max_items:
+                    self._cache.popitem(last=False)
+        return prompt, tokens
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            out: dict[str, Any] = dict(self.counters)
+            out["items"] = len(self._cache)
+        return out
@@ -0,0 +1,247 @@
+"""
+Inverted index over analyzed resumes, for the reverse of /suitable: given a
+track, rank every resume we have seen.
+
+Resumes live in SQLite (id, content hash, label, skills). In memory each skill
+keeps a sorted uint32 postings array of resume ids; a track query sums the
+postings of its blueprint skills with one bincount and scores every candidate
+with the same formula as match_score. Postings are snapshotted to a
+delta-encoded, compressed .npz so a restart doesn't re-read every row.
+
+    python resume_index.py snapshot DIR      # write the postings snapshot now
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import weakref
+from typing import Any, Iterable
+
+import numpy as np
+
+from scoring import match_score, unique_norm_list
+
+SNAPSHOT_EVERY = 50000  # minimum new resumes between automatic snapshots
+
+
+_instances: weakref.WeakSet[ResumeIndex] = weakref.WeakSet()
+
+
+def _reopen_after_fork() -> None:
+    # SQLite connections must not cross fork (gunicorn preload): each child
+    # reconnects and reloads; an in-memory index starts empty per process
+    for index in list(_instances):
+        index._open()
+
+
+os.register_at_fork(after_in_child=_reopen_after_fork)
+
+
+class ResumeIndex:
+    def __init__(self, path: str | None = None):
+        """path: directory for resumes.db + postings.npz; None keeps everything in memory."""
+        self.dir = path
+        if path:
+            os.makedirs(path, exist_ok=True)
+        self._open()
+        _instances.add(self)
+
+    def _open(self) -> None:
+        path = self.dir
+        self._db = sqlite3.connect(os.path.join(path, "resumes.db") if path else ":memory:",
+                                   check_same_thread=False, isolation_level=None, timeout=30)
+        if path:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS resumes ("
+            " id INTEGER PRIMARY KEY, key TEXT UNIQUE NOT NULL, label TEXT, skills TEXT NOT NULL)"
+        )
+        self._lock = threading.RLock()
+        self._postings: dict[str, np.ndarray] = {}
+        self._pending: dict[str, list[int]] = {}
+        self._max_id = 0
+        self._since_snapshot = 0
+        self._load_snapshot()
+        self.refresh()
+
+    # building
+
+    def add(self, key: str, skills: Iterable[str], label: str = "") -> int:
+        """Index one resume (by content hash); re-adding the same key is a no-op."""
+        skills = unique_norm_list(skills)
+        with self._lock:
+            cur = self._db.execute(
+                "INSERT OR IGNORE INTO resumes (key, label, skills) VALUES (?, ?, ?)",
+                (key, label, json.dumps(skills)),
+            )
+            if cur.rowcount == 0:
+                return self._db.execute("SELECT id FROM resumes WHERE key = ?", (key,)).fetchone()[0]
+            # pick up rows other workers added first, so postings stay sorted
+            self.refresh()
+            return cur.lastrowid
+
+    def add_many(self, rows: Iterable[tuple[str, Iterable[str], str]]) -> int:
+        """Bulk add (key, skills, label) rows in one transaction; returns how many were new."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                # under the write lock, so no other process can add ids below next_id before we insert
+                self.refresh()
+                next_id = (self._db.execute("SELECT MAX(id) FROM resumes").fetchone()[0] or 0) + 1
+                seen = set()
+                batch = []
+                for key, skills, label in rows:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    batch.append((key, label, unique_norm_list(skills)))
+                existing = set()
+                keys = [b[0] for b in batch]
+                for i in range(0, len(keys), 500):
+                    part = keys[i:i + 500]
+                    existing.update(r[0] for r in self._db.execute(
+                        f"SELECT key FROM resumes WHERE key IN ({','.join('?' * len(part))})", part))
+                new = [(key, label, skills) for key, label, skills in batch if key not in existing]
+                self._db.executemany(
+                    "INSERT INTO resumes (id, key, label, skills) VALUES (?, ?, ?, ?)",
+                    ((next_id + i, key, label, json.dumps(skills)) for i, (key, label, skills) in enumerate(new)),
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._append_rows((next_id + i, skills) for i, (_, _, skills) in enumerate(new))
+            return len(new)
+
+    def refresh(self) -> None:
+        """Load rows added since we last looked (by this or another process)."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, skills FROM resumes WHERE id > ? ORDER BY id", (self._max_id,)
+            ).fetchall()
+            self._append_rows((rid, json.loads(skills)) for rid, skills in rows)
+
+    def _append_rows(self, rows) -> None:
+        n = 0
+        for rid, skills in rows:
+            for s in skills:
+                self._pending.setdefault(s, []).append(rid)
+            self._max_id = max(self._max_id, rid)
+            n += 1
+        self._since_snapshot += n
+        # grow the interval with the index so bulk builds rewrite it O(log n) times
+        if self.dir and self._since_snapshot >= max(SNAPSHOT_EVERY, self._max_id // 2):
+            self.save()
+
+    def _posting(self, skill: str) -> np.ndarray | None:
+        pending = self._pending.pop(skill, None)
+        arr = self._postings.get(skill)
+        if pending:
+            # ids only grow, so appending keeps the array sorted
+            add = np.asarray(pending, dtype=np.uint32)
+            arr = add if arr is None else np.concatenate([arr, add])
+            self._postings[skill] = arr
+        return arr
+
+    # persistence
+
+    def _snapshot_path(self) -> str:
+        return os.path.join(self.dir or "", "postings.npz")
+
+    def save(self) -> None:
+        if not self.dir:
+            return
+        with self._lock:
+            for skill in list(self._pending):
+                self._posting(skill)
+            names = sorted(self._postings)
+            arrays = [self._postings[s] for s in names]
+            offsets = np.cumsum([0] + [len(a) for a in arrays]).astype(np.int64)
+            # delta-encode each list (small gaps compress far better than raw ids)
+            deltas = np.concatenate([np.diff(a, prepend=np.uint32(0)) for a in arrays]) if arrays \
+                else np.zeros(0, dtype=np.uint32)
+            tmp = self._snapshot_path() + f".{os.getpid()}.tmp.npz"
+            np.savez_compressed(tmp, names=np.array(json.dumps(names)), offsets=offsets,
+                                deltas=deltas.astype(np.uint32), max_id=np.int64(self._max_id))
+            os.replace(tmp, self._snapshot_path())
+            self._since_snapshot = 0
+
+    def _load_snapshot(self) -> None:
+        if not self.dir or not os.path.exists(self._snapshot_path()):
+            return
+        with np.load(self._snapshot_path()) as z:
+            names = json.loads(str(z["names"]))
+            offsets = z["offsets"]
+            deltas = z["deltas"]
+            self._max_id = int(z["max_id"])
+        for i, name in enumerate(names):
+            self._postings[name] = np.cumsum(deltas[offsets[i]:offsets[i + 1]], dtype=np.uint32)
+
+    # querying
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM resumes").fetchone()[0]
+
+    def skill_lists(self, limit: int = 100000) -> list[list[str]]:
+        """Skills of the most recently indexed resumes (a corpus for TF-IDF fitting)."""
+        with self._lock:
+            rows = self._db.execute("SELECT skills FROM resumes ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def search(self, blueprint: list[str], offset: int = 0, limit: int = 20) -> dict[str, Any]:
+        """
+        Resumes ranked for one blueprint: score desc, then oldest first.
+        Resumes matching none of its skills are left out of the ranking.
+        """
+        b = unique_norm_list(blueprint)
+        with self._lock:
+            self.refresh()
+            arrays = [a for a in (self._posting(s) for s in b) if a is not None and len(a)]
+            size = self._max_id + 1
+        if not b or not arrays:
+            return {"total": 0, "results": []}
+
+        counts = np.bincount(np.concatenate(arrays), minlength=size)
+        ids = np.flatnonzero(counts)
+        # same float ops and half-to-even rounding as match_score
+        scores = np.rint((counts[ids] / len(b)) * 100).astype(np.int64)
+        total = len(ids)
+
+        end = min(offset + limit, total)
+        if offset >= end:
+            return {"total": total, "results": []}
+        key = scores * size + (size - 1 - ids)
+        top = np.argpartition(-key, end - 1)[:end] if end < total else np.arange(total)
+        top = top[np.argsort(-key[top])][offset:end]
+
+        page_ids = [int(ids[i]) for i in top]
+        with self._lock:
+            rows = {rid: (k, label, skills) for rid, k, label, skills in self._db.execute(
+                f"SELECT id, key, label, skills FROM resumes WHERE id IN ({','.join('?' * len(page_ids))})",
+                page_ids)}
+        results = []
+        for rid in page_ids:
+            k, label, skills = rows[rid]
+            score, matched, missing = match_score(json.loads(skills), b)
+            results.append({"id": rid, "key": k, "label": label, "score": score,
+                            "matched": matched, "missing": missing})
+        return {"total": total, "results": results}
+
+
+def main(argv: list[str]) -> int:
+    if len(argv) != 2 or argv[0] != "snapshot":
+        print(__doc__)
+        return 2
+    idx = ResumeIndex(argv[1])
+    idx.save()
+    print(f"{len(idx)} resumes, {len(idx._postings)} skills -> {idx._snapshot_path()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,11 +1,282 @@
-import PyPDF2
+from __future__ import annotations
 
+import io
+import mmap
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from typing import Iterator
 
-def extract_text_from_pdf(file):
-    reader = PyPDF2.PdfReader(file)
-    text = ""
 
-    for page in reader.pages:
-        text += page.extract_text()
+# Budgets for a single upload (override with env vars)
+PDF_MAX_PAGES = int(os.environ.get("PDF_MAX_PAGES", "30"))
+PDF_MAX_CHARS = int(os.environ.get("PDF_MAX_CHARS", "200000"))
+PDF_MAX_SECONDS = float(os.environ.get("PDF_MAX_SECONDS", "8"))
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", "4"))
+PDF_REJECT_PAGES = int(os.environ.get("PDF_REJECT_PAGES", "300"))  # longer than this is not a resume
+# uploads above this are spooled to a temp file and memory-mapped instead of read into memory
+UPLOAD_SPOOL_BYTES = int(os.environ.get("UPLOAD_SPOOL_KB", "256")) * 1024
 
-    return text
+_pool: ThreadPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=PDF_WORKERS, thread_name_prefix="pdf")
+        return _pool
+
+
+def _reset_after_fork() -> None:
+    # pool threads don't survive fork (gunicorn preload, batch process pool)
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+class _BufferStream:
+    """
+    Read-only file object over an mmap, with its own position.
+    read() slices only what was asked for, so several readers can share one
+    mapping without copying the whole file.
+    """
+
+    def __init__(self, buf):
+        self._buf = buf
+        self._pos = 0
+        self._size = len(buf)
+
+    def read(self, n: int = -1) -> bytes:
+        end = self._size if n is None or n < 0 else min(self._pos + n, self._size)
+        out = self._buf[self._pos:end]
+        self._pos = max(end, self._pos)
+        return out
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self._size
+        self._pos = max(offset, 0)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+
+@contextmanager
+def upload_buffer(stream) -> Iterator[bytes | mmap.mmap]:
+    """
+    An upload's bytes without a second full copy in memory. Small uploads
+    are read; larger ones (already spooled to a temp file) are mapped
+    read-only, so the parse pulls in only the pages of the file it touches
+    and they stay reclaimable page cache rather than heap.
+    """
+    stream.seek(0, io.SEEK_END)
+    size = stream.tell()
+    stream.seek(0)
+    if size <= UPLOAD_SPOOL_BYTES:
+        yield stream.read()
+        return
+    try:
+        fd = stream.fileno()  # rolls a SpooledTemporaryFile over to disk if it hasn't yet
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        yield stream.read()
+        return
+    stream.flush()
+    mapped = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+    try:
+        yield mapped
+    finally:
+        mapped.close()
+
+
+def _pdf_reader(data):
+    # imported on first use so processes that never parse a PDF don't load it
+    from PyPDF2 import PdfReader
+
+    # BytesIO is C code and shares a bytes object without copying; only an mmap needs _BufferStream
+    reader = PdfReader(_BufferStream(data) if isinstance(data, mmap.mmap) else io.BytesIO(data))
+    # owner-password-only PDFs (print/copy restrictions) open with an empty user password
+    if reader.is_encrypted and not reader.decrypt(""):
+        raise PdfRejected("encrypted")
+    return reader
+
+
+# Pre-screening
+
+REJECT_MESSAGES = {
+    "empty": "The uploaded file is empty.",
+    "not_pdf": "This file is not a PDF.",
+    "too_large": "The file is too large.",
+    "corrupt": "This PDF is damaged and could not be read.",
+    "encrypted": "This PDF is password protected. Please upload an unprotected copy.",
+    "no_pages": "This PDF has no pages.",
+    "too_many_pages": "This PDF has too many pages to be a resume.",
+    "image_only": "This PDF looks like a scan (no text layer). Please upload a text-based PDF.",
+    "unreadable": "We couldn't read text from this PDF.",
+}
+
+
+# why iter_pdf_pages stopped early, for the notice shown with a partial analysis
+TRUNCATED_MESSAGES = {
+    "pages": f"Only the first {PDF_MAX_PAGES} pages of this PDF were analyzed.",
+    "chars": "This resume is longer than we analyze, so only the first part of its text was used.",
+    "seconds": "Reading this PDF took too long, so only part of it was analyzed. Upload it again for a full analysis.",
+}
+
+
+class PdfRejected(ValueError):
+    """An upload we won't (or can't) parse, with a stable code for clients and metrics."""
+
+    def __init__(self, code: str, detail: str = ""):
+        self.code = code
+        self.detail = detail
+        super().__init__(REJECT_MESSAGES.get(code, code))
+
+
+def _has_text_layer(page) -> bool:
+    # Only looks at the page's resource dictionary, no content stream decoding:
+    # text needs a font, and form XObjects may carry their own fonts and text.
+    resources = page.get("/Resources")
+    resources = resources.get_object() if resources is not None else {}
+    if resources.get("/Font"):
+        return True
+    xobjects = resources.get("/XObject")
+    if xobjects:
+        for ref in xobjects.get_object().values():
+            if ref.get_object().get("/Subtype") == "/Form":
+                return True
+    return False
+
+
+def prescreen_pdf(data: bytes, max_pages: int | None = None) -> int:
+    """
+    Cheap checks before a full parse: magic bytes, cross-reference table,
+    encryption, page count and whether any page can hold text at all.
+    Reads no page content. Returns the page count or raises PdfRejected.
+    """
+    if not data:
+        raise PdfRejected("empty")
+    # the spec lets a header start anywhere in the first 1KB
+    if b"%PDF-" not in data[:1024]:
+        raise PdfRejected("not_pdf")
+    try:
+        reader = _pdf_reader(data)
+    except PdfRejected:
+        raise
+    except Exception as e:
+        # e.g. AES encryption needs a crypto library we don't ship
+        raise PdfRejected("encrypted" if data.find(b"/Encrypt") != -1 else "corrupt", f"{type(e).__name__}: {e}")
+    try:
+        pages = len(reader.pages)
+    except Exception as e:
+        raise PdfRejected("corrupt", f"{type(e).__name__}: {e}")
+    if pages == 0:
+        raise PdfRejected("no_pages")
+    if pages > PDF_REJECT_PAGES:
+        raise PdfRejected("too_many_pages", f"{pages} pages")
+
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    try:
+        if not any(_has_text_layer(reader.pages[i]) for i in range(min(pages, max_pages))):
+            raise PdfRejected("image_only")
+    except PdfRejected:
+        raise
+    except Exception as e:
+        raise PdfRejected("corrupt", f"{type(e).__name__}: {e}")
+    return pages
+
+
+def _read_bytes(file):
+    if isinstance(file, (bytes, bytearray, mmap.mmap)):
+        return file
+    if hasattr(file, "seek"):
+        file.seek(0)
+    return file.read()
+
+
+def _page_text(data, index: int, readers: dict) -> str:
+    # PdfReader seeks one shared stream, so every pool thread keeps its own
+    # reader over the same bytes instead of sharing one across threads.
+    # readers belongs to one iter_pdf_pages call and is dropped with it.
+    ident = threading.get_ident()
+    reader = readers.get(ident)
+    if reader is None:
+        reader = readers[ident] = _pdf_reader(data)
+    return reader.pages[index].extract_text() or ""
+
+
+def iter_pdf_pages(file, max_pages: int | None = None, max_chars: int | None = None,
+                   max_seconds: float | None = None, workers: int | None = None):
+    """
+    Yield the text of each page in order while later pages are parsed on the pool.
+    Stops at whichever budget runs out first: page count, total characters
+    (the last page is cut to fit) or wall-clock seconds. The generator returns
+    (as StopIteration.value) the budget that cut the text short, "pages",
+    "chars" or "seconds", or None when every page was read in full.
+    """
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    max_chars = PDF_MAX_CHARS if max_chars is None else max_chars
+    max_seconds = PDF_MAX_SECONDS if max_seconds is None else max_seconds
+    workers = PDF_WORKERS if workers is None else workers
+
+    deadline = time.monotonic() + max_seconds
+    data = _read_bytes(file)
+    reader = _pdf_reader(data)
+    count = min(len(reader.pages), max_pages)
+    cut = "pages" if count < len(reader.pages) else None
+    remaining = max_chars
+
+    if workers <= 1:
+        for i in range(count):
+            if remaining <= 0:
+                return "chars"
+            if time.monotonic() >= deadline:
+                return "seconds"
+            text = reader.pages[i].extract_text() or ""
+            if len(text) > remaining:
+                text, cut = text[:remaining], "chars"
+            remaining -= len(text)
+            yield text
+        return cut
+
+    pool = _get_pool()
+    # keep a small window of pages in flight so an early stop wastes little work
+    window = workers * 2
+    readers: dict = {}
+    pending = [pool.submit(_page_text, data, i, readers) for i in range(min(window, count))]
+    submitted = len(pending)
+    try:
+        while pending:
+            if remaining <= 0:
+                return "chars"
+            left = deadline - time.monotonic()
+            if left <= 0:
+                return "seconds"
+            try:
+                text = pending.pop(0).result(timeout=left)
+            except FutureTimeout:
+                return "seconds"
+            if submitted < count:
+                pending.append(pool.submit(_page_text, data, submitted, readers))
+                submitted += 1
+            if len(text) > remaining:
+                text, cut = text[:remaining], "chars"
+            remaining -= len(text)
+            yield text
+        return cut
+    finally:
+        for fut in pending:
+            fut.cancel()
+
+
+def extract_text_from_pdf(file, **budgets):
+    return "".join(iter_pdf_pages(file, **budgets))
@@ -1,5 +1,16 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Mapping
+
+log = logging.getLogger(__name__)
+
 
 def _cfg(title: str, path: str, skills: list[str]):
     return {"title": title, "path": path, "skills": skills}
@@ -157,72 +168,233 @@ ROLES = {
 }
 
 
+# Difficulty buckets (tune later); a catalog file can override them
+DIFFICULTY = {
+    "easy": ["html", "css", "sql", "excel", "git",
+             "python", "java", "javascript", "statistics", "networking", "linux"],
+    "medium": ["pandas", "numpy", "rest api", "spring", "spring boot",
+               "flask", "django", "react", "node", "docker", "power bi", "tableau",
+               "fastapi", "express", "mongodb", "postgresql", "mysql"],
+    "hard": ["kubernetes", "microservices", "kafka", "spark", "airflow",
+             "mlops", "terraform", "transformers", "pytorch", "data warehousing",
+             "feature engineering", "model deployment", "model evaluation", "ci/cd"],
+}
+_LEVELS = {"easy": 1, "medium": 2, "hard": 3}
+_LEVEL_LABELS = {1: "Easy", 2: "Intermediate", 3: "Advanced"}
+# Realistic weeks (instead of silly "days")
+# Easy: 1–2 weeks, Medium: 2–4 weeks, Hard: 4–8 weeks
+_WEEKS_FOR = {1: 2, 2: 4, 3: 8}
+
+# External catalog (JSON or YAML). Re-read when its mtime changes, checked at
+# most every ROLES_RELOAD_SECONDS, so workers pick up edits without a restart.
+ROLES_FILE = os.environ.get("ROLES_FILE", "").strip()
+ROLES_RELOAD_SECONDS = float(os.environ.get("ROLES_RELOAD_SECONDS", "2"))
+
+
+class Catalog:
+    """
+    ROLES compiled once into read-only, indexed structures:
+    (role, category, track) -> track, path -> track, skill -> track indices,
+    and a frozen skill -> difficulty level table. Never mutated after build;
+    a reload builds a new Catalog and swaps it in.
+
+    Every track's roadmap is also pre-sorted into a step skeleton, each step
+    built in both its has/missing forms and tagged with its skill's bit in a
+    catalog-wide skill bitmask. A request only picks a form per step; across
+    several tracks the detected skills become one int mask, built once.
+    """
+
+    def __init__(self, roles: dict[str, Any], difficulty: dict[str, list[str]] | None = None,
+                 source: str = "builtin"):
+        difficulty = difficulty or DIFFICULTY
+        self.source = source
+        # plain nested dict, for JSON payloads and templates
+        self.roles = roles
+        self.version = hashlib.sha1(
+            json.dumps([roles, difficulty], sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()[:12]
+
+        tracks = []
+        index = {}
+        by_key = {}
+        by_path = {}
+        skill_index: dict[str, list[int]] = {}
+        for role, cats in roles.items():
+            for cat, trs in cats.items():
+                for track, cfg in trs.items():
+                    skills = tuple(cfg["skills"])
+                    entry = MappingProxyType({
+                        "role": role,
+                        "category": cat,
+                        "track": track,
+                        "title": cfg["title"],
+                        "path": cfg["path"],
+                        "skills": skills,
+                    })
+                    i = len(tracks)
+                    tracks.append(entry)
+                    index[(role, cat, track)] = i
+                    by_key[(role, cat, track)] = entry
+                    by_path[cfg["path"]] = entry
+                    for sk in dict.fromkeys(x.strip().lower() for x in skills):
+                        skill_index.setdefault(sk, []).append(i)
+
+        self.tracks: tuple[Mapping[str, Any], ...] = tuple(tracks)
+        self.index = MappingProxyType(index)
+        self.by_key = MappingProxyType(by_key)
+        self.by_path = MappingProxyType(by_path)
+        self.skill_index = MappingProxyType({k: tuple(v) for k, v in skill_index.items()})
+        self.difficulty = MappingProxyType({
+            sk.strip().lower(): _LEVELS[level]
+            for level in ("hard", "medium", "easy")  # easy wins on overlaps, like the old if-chain
+            for sk in difficulty.get(level, [])
+        })
+
+        # bit per distinct skill, then each track's steps sorted once by
+        # (level, weeks); stable, so catalog order is kept within a level
+        self.skill_bits = MappingProxyType({sk: b for b, sk in enumerate(self.skill_index)})
+        skeletons = []
+        for entry in self.tracks:
+            steps = []
+            for s in entry["skills"]:
+                sl = s.strip().lower()
+                level = self.difficulty.get(sl, 2)
+                step = {"skill": sl, "level": level, "level_label": _LEVEL_LABELS[level],
+                        "weeks": _WEEKS_FOR[level]}
+                steps.append((self.skill_bits.get(sl, -1),
+                              MappingProxyType({**step, "has": True}),
+                              MappingProxyType({**step, "has": False})))
+            steps.sort(key=lambda x: (x[1]["level"], x[1]["weeks"]))
+            skeletons.append(tuple(steps))
+        self._roadmaps = tuple(skeletons)
+
+    def track(self, role: str, category: str, track: str) -> Mapping[str, Any] | None:
+        return self.by_key.get((role, category, track))
+
+    def tracks_with_skill(self, skill: str) -> list[Mapping[str, Any]]:
+        return [self.tracks[i] for i in self.skill_index.get(skill.strip().lower(), ())]
+
+    def skill_mask(self, detected) -> int:
+        """Detected skills as one int, a bit per catalog skill (others are ignored)."""
+        mask = 0
+        bits = self.skill_bits
+        for s in detected:
+            b = bits.get(s)
+            if b is not None:
+                mask |= 1 << b
+        return mask
+
+    def roadmap(self, i: int, detected_set) -> list[Mapping[str, Any]]:
+        """
+        Track i's steps (read-only) with "has" overlaid: the ones you have
+        first, each group in skeleton order. One pass, nothing re-sorted.
+        """
+        have, need = [], []
+        for _, has, missing in self._roadmaps[i]:
+            if has["skill"] in detected_set:
+                have.append(has)
+            else:
+                need.append(missing)
+        return have + need
+
+    def merged_roadmap(self, indices, mask: int) -> list[dict[str, Any]]:
+        """
+        One roadmap over several tracks (e.g. the top /suitable matches): each
+        skill once, with the titles of the tracks that need it. Skills you have
+        come first, then those more tracks share, then by difficulty.
+        """
+        merged: dict[str, dict[str, Any]] = {}
+        for i in indices:
+            title = self.tracks[i]["title"]
+            for bit, has, missing in self._roadmaps[i]:
+                cur = merged.get(has["skill"])
+                if cur is None:
+                    step = has if bit >= 0 and mask >> bit & 1 else missing
+                    merged[has["skill"]] = {**step, "tracks": [title]}
+                elif title not in cur["tracks"]:
+                    cur["tracks"].append(title)
+        return sorted(merged.values(), key=lambda x: (not x["has"], -len(x["tracks"]), x["level"], x["weeks"]))
+
+
+def load_catalog_file(path: str) -> Catalog:
+    """
+    {"roles": {role: {category: {track: {title, path, skills}}}}, "difficulty": {...}}
+    or just the roles mapping. .yaml/.yml needs PyYAML.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if path.lower().endswith((".yaml", ".yml")):
+            import yaml  # optional, only for YAML catalogs
+            doc = yaml.safe_load(f)
+        else:
+            doc = json.load(f)
+    if not isinstance(doc, dict):
+        raise ValueError(f"{path}: catalog must be a mapping")
+    roles = doc.get("roles", doc)
+    difficulty = doc.get("difficulty") if "roles" in doc else None
+    for role, cats in roles.items():
+        for cat, trs in cats.items():
+            for track, cfg in trs.items():
+                missing = {"title", "path", "skills"} - set(cfg)
+                if missing:
+                    raise ValueError(f"{path}: {role} / {cat} / {track} is missing {sorted(missing)}")
+    return Catalog(roles, difficulty, source=path)
+
+
+_catalog = Catalog(ROLES)
+_catalog_mtime: float | None = None
+_next_check = 0.0
+_reload_lock = threading.Lock()
+
+
+def catalog() -> Catalog:
+    """The current catalog, reloading ROLES_FILE first if it changed on disk."""
+    global _catalog, _catalog_mtime, _next_check
+    if not ROLES_FILE:
+        return _catalog
+    now = time.monotonic()
+    if now < _next_check:
+        return _catalog
+    with _reload_lock:
+        if now < _next_check:
+            return _catalog
+        _next_check = now + ROLES_RELOAD_SECONDS
+        try:
+            mtime = os.stat(ROLES_FILE).st_mtime
+        except OSError as e:
+            log.warning("roles catalog %s unavailable, keeping %s: %s", ROLES_FILE, _catalog.source, e)
+            return _catalog
+        if mtime != _catalog_mtime:
+            try:
+                _catalog = load_catalog_file(ROLES_FILE)
+                log.info("loaded roles catalog %s (version %s, %d tracks)",
+                         ROLES_FILE, _catalog.version, len(_catalog.tracks))
+            except Exception as e:
+                # a half-written or broken file must not take the site down
+                log.warning("roles catalog %s failed to load, keeping previous: %s", ROLES_FILE, e)
+            _catalog_mtime = mtime
+    return _catalog
+
+
 def get_role_config(role: str, category: str, track: str):
-    try:
-        cfg = ROLES[role][category][track]
-        return {"role": role, "category": category, "track": track, **cfg}
-    except Exception:
-        return None
+    return catalog().track(role, category, track)
 
 
 def flatten_all_tracks():
-    out = []
-    for role, cats in ROLES.items():
-        for cat, tracks in cats.items():
-            for track, cfg in tracks.items():
-                out.append({
-                    "role": role,
-                    "category": cat,
-                    "track": track,
-                    "title": cfg["title"],
-                    "path": cfg["path"],
-                    "skills": cfg["skills"],
-                })
-    return out
+    return catalog().tracks
 
 
 def build_roadmap_for_role(role: str, category: str, track: str, detected_set: set[str]):
-    cfg = get_role_config(role, category, track)
-    if not cfg:
+    cat = catalog()
+    i = cat.index.get((role, category, track))
+    if i is None:
         return []
+    # Skills you already have first, then by difficulty, then by weeks
+    return cat.roadmap(i, detected_set)
 
-    # Difficulty buckets (tune later)
-    easy = {"html", "css", "sql", "excel", "git",
-            "python", "java", "javascript", "statistics", "networking", "linux"}
-    medium = {"pandas", "numpy", "rest api", "spring", "spring boot",
-              "flask", "django", "react", "node", "docker", "power bi", "tableau",
-              "fastapi", "express", "mongodb", "postgresql", "mysql"}
-    hard = {"kubernetes", "microservices", "kafka", "spark", "airflow",
-            "mlops", "terraform", "transformers", "pytorch", "data warehousing",
-            "feature engineering", "model deployment", "model evaluation", "ci/cd"}
-
-    # Realistic weeks (instead of silly "days")
-    # Easy: 1–2 weeks, Medium: 2–4 weeks, Hard: 4–8 weeks
-    steps = []
-    for s in cfg["skills"]:
-        sl = s.strip().lower()
-
-        if sl in easy:
-            level = 1
-            weeks = 2
-        elif sl in medium:
-            level = 2
-            weeks = 4
-        elif sl in hard:
-            level = 3
-            weeks = 8
-        else:
-            level = 2
-            weeks = 4
-
-        steps.append({
-            "skill": sl,
-            "level": level,
-            "level_label": "Easy" if level == 1 else ("Intermediate" if level == 2 else "Advanced"),
-            "weeks": weeks,
-            "has": sl in detected_set
-        })
 
-    # Skills you already have first, then by difficulty, then by weeks
-    steps.sort(key=lambda x: (not x["has"], x["level"], x["weeks"]))
-    return steps
+def build_multi_roadmap(tracks, detected_set: set[str]):
+    """Merged roadmap for several tracks, given as dicts with role/category/track."""
+    cat = catalog()
+    indices = [i for i in (cat.index.get((t["role"], t["category"], t["track"])) for t in tracks)
+               if i is not None]
+    return cat.merged_roadmap(indices, cat.skill_mask(detected_set))
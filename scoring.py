@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import logging
+import os
+from typing import TYPE_CHECKING, Any, Iterable
+
+import numpy as np
+from scipy import sparse
+
+if TYPE_CHECKING:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+log = logging.getLogger(__name__)
+
+
+def normalize_skill(s: str) -> str:
+    return " ".join((s or "").strip().lower().split())
+
+
+def unique_norm_list(items):
+    seen = set()
+    out = []
+    for x in items or []:
+        nx = normalize_skill(x)
+        if nx and nx not in seen:
+            seen.add(nx)
+            out.append(nx)
+    return out
+
+
+def match_score(detected: list[str], blueprint: list[str]) -> tuple[int, list[str], list[str]]:
+    dset = set(unique_norm_list(detected))
+    b = unique_norm_list(blueprint)
+
+    matched = [x for x in b if x in dset]
+    missing = [x for x in b if x not in dset]
+
+    score = int(round((len(matched) / len(b)) * 100)) if b else 0
+    return score, matched, missing
+
+
+class TrackMatrix:
+    """
+    All tracks compiled once into a skill vocabulary and a sparse track×skill
+    0/1 matrix. A resume becomes one 0/1 vector over the vocabulary, and
+    matrix @ vector gives the matched count of every track at once.
+
+    Scores, ranking and tie order are the same as calling match_score per
+    track and stable-sorting by score.
+    """
+
+    def __init__(self, tracks: list[dict[str, Any]]):
+        self.tracks = [{k: v for k, v in t.items() if k != "skills"} for t in tracks]
+        self.vocab: dict[str, int] = {}
+        self.blueprints: list[list[str]] = []
+        rows, cols = [], []
+        sizes = []
+        for i, t in enumerate(tracks):
+            blueprint = unique_norm_list(t["skills"])
+            self.blueprints.append(blueprint)
+            sizes.append(len(blueprint))
+            for s in blueprint:
+                rows.append(i)
+                cols.append(self.vocab.setdefault(s, len(self.vocab)))
+
+        self.matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float64), (rows, cols)),
+            shape=(len(tracks), max(len(self.vocab), 1)),
+        )
+        self.sizes = np.asarray(sizes, dtype=np.float64)
+
+    def vector(self, detected) -> np.ndarray:
+        v = np.zeros(self.matrix.shape[1], dtype=np.float64)
+        for s in unique_norm_list(detected):
+            j = self.vocab.get(s)
+            if j is not None:
+                v[j] = 1.0
+        return v
+
+    def scores(self, detected) -> np.ndarray:
+        matched = self.matrix @ self.vector(detected)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # same float ops and half-to-even rounding as match_score
+            pct = np.rint((matched / self.sizes) * 100)
+        return np.where(self.sizes > 0, pct, 0).astype(np.int64)
+
+    def top(self, detected, k: int = 10) -> list[dict[str, Any]]:
+        return _top(self.tracks, self.scores(detected), k)
+
+    def compare(self, detected, indices: list[int] | None = None) -> list[dict[str, Any]]:
+        """
+        One resume against many tracks (all when indices is None), scored in
+        one pass. Per track: score, matched and missing (blueprint order, as
+        match_score gives them), and the diff to the first track, the
+        baseline: score delta and the missing skills the baseline doesn't ask for.
+        """
+        idx = list(range(len(self.tracks))) if indices is None else list(indices)
+        if not idx:
+            return []
+        scores = self.scores(detected)
+        dset = set(unique_norm_list(detected))
+        base_score = int(scores[idx[0]])
+        base_skills = set(self.blueprints[idx[0]])
+        out = []
+        for i in idx:
+            blueprint = self.blueprints[i]
+            missing = [x for x in blueprint if x not in dset]
+            out.append({
+                **self.tracks[i],
+                "score": int(scores[i]),
+                "delta": int(scores[i]) - base_score,
+                "matched": [x for x in blueprint if x in dset],
+                "missing": missing,
+                "extra_missing": [x for x in missing if x not in base_skills],
+            })
+        return out
+
+
+def _top(tracks: list[dict[str, Any]], scores: np.ndarray, k: int) -> list[dict[str, Any]]:
+    n = len(scores)
+    if n == 0 or k <= 0:
+        return []
+    # higher score first, catalog order on ties (what a stable sort gives)
+    key = scores * n + (n - 1 - np.arange(n))
+    k = min(k, n)
+    idx = np.argpartition(-key, k - 1)[:k]
+    idx = idx[np.argsort(-key[idx])]
+    return [{**tracks[i], "score": int(scores[i])} for i in idx]
+
+
+# Weighted / fuzzy scoring
+
+def skill_document(skills) -> str:
+    return " ".join(unique_norm_list(skills))
+
+
+def fit_skill_vectorizer(tracks: list[dict[str, Any]], corpus: Iterable[list[str]] = ()) -> TfidfVectorizer:
+    """
+    Character n-grams of skill names, so "springboot" still lands close to
+    "spring boot", with IDF over tracks and past resumes, so skills that
+    every resume lists count for less than rare ones.
+    """
+    # scikit-learn costs ~1s to import; only the tfidf mode pays for it
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    docs = [skill_document(t["skills"]) for t in tracks]
+    docs.extend(skill_document(skills) for skills in corpus)
+    vec = TfidfVectorizer(analyzer="char_wb", ngram_range=(3, 5), sublinear_tf=True, dtype=np.float32)
+    vec.fit(docs)
+    return vec
+
+
+class TfidfMatrix:
+    """
+    Alternative to TrackMatrix: every track as an L2-normalized TF-IDF vector,
+    so one sparse product with the resume's vector gives the cosine similarity
+    (0-100) against all tracks. Scores are not comparable to match_score.
+    """
+
+    def __init__(self, tracks: list[dict[str, Any]], vectorizer: TfidfVectorizer):
+        self.tracks = [{k: v for k, v in t.items() if k != "skills"} for t in tracks]
+        self.vectorizer = vectorizer
+        self.matrix = vectorizer.transform([skill_document(t["skills"]) for t in tracks]).tocsr()
+
+    @classmethod
+    def load_or_fit(cls, tracks: list[dict[str, Any]], version: str, cache_dir: str | None = None,
+                    corpus=None) -> "TfidfMatrix":
+        """
+        The fitted vectorizer is kept in cache_dir per version (catalog + skill
+        bank), so workers and restarts load it instead of refitting.
+        corpus is a callable returning resume skill lists, only called on a miss.
+        """
+        import joblib
+
+        path = os.path.join(cache_dir, f"tfidf-{version}.joblib") if cache_dir else None
+        vectorizer = None
+        if path and os.path.exists(path):
+            try:
+                vectorizer = joblib.load(path)
+            except Exception:
+                vectorizer = None  # partial or stale file: refit below
+        if vectorizer is None:
+            vectorizer = fit_skill_vectorizer(tracks, corpus() if corpus else ())
+            if path:
+                tmp = f"{path}.{os.getpid()}.tmp"
+                try:
+                    os.makedirs(cache_dir, exist_ok=True)
+                    joblib.dump(vectorizer, tmp)
+                    os.replace(tmp, path)
+                except OSError as e:
+                    # read-only or missing cache dir: keep the fit in memory, refit on the next start
+                    log.warning("could not cache the TF-IDF model in %s: %s", cache_dir, e)
+                    try:
+                        os.remove(tmp)
+                    except OSError:
+                        pass
+        return cls(tracks, vectorizer)
+
+    def scores(self, detected) -> np.ndarray:
+        v = self.vectorizer.transform([skill_document(detected)])
+        sim = (self.matrix @ v.T).toarray().ravel()
+        return np.rint(np.clip(sim, 0.0, 1.0) * 100).astype(np.int64)
+
+    def top(self, detected, k: int = 10) -> list[dict[str, Any]]:
+        return _top(self.tracks, self.scores(detected), k)
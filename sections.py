@@ -0,0 +1,173 @@
+"""
+Section-aware skill detection, so a re-upload of an edited resume only
+re-scans what changed.
+
+Extracted text is cut into chunks at page breaks and at section headings
+("Experience", "Skills", ...). Each chunk is hashed (lowercased text + skill
+bank version) and keeps the skills found in it; given the chunks of an earlier
+analysis, SectionScanner only runs extract_skills on chunks it hasn't seen.
+A skill that straddles two chunks ("machine" | "learning") is picked up by a
+small scan of the last/first MAX_SKILL_TOKENS tokens around each boundary, so
+the detected set is the same as one scan of the whole text.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Iterable
+
+from skill_extractor import _TOKEN_RE, MAX_SKILL_TOKENS, SKILL_BANK_VERSION, extract_skills
+
+# heading line (lowercased) -> section name
+SECTION_HEADINGS = {
+    "summary": "summary", "professional summary": "summary", "profile": "summary",
+    "objective": "summary", "career objective": "summary", "about me": "summary",
+    "experience": "experience", "work experience": "experience",
+    "professional experience": "experience", "employment": "experience",
+    "employment history": "experience", "work history": "experience",
+    "internships": "experience", "internship": "experience",
+    "education": "education", "academic background": "education",
+    "skills": "skills", "technical skills": "skills", "core skills": "skills",
+    "key skills": "skills", "competencies": "skills", "core competencies": "skills",
+    "tools": "skills", "technologies": "skills", "tech stack": "skills",
+    "projects": "projects", "personal projects": "projects", "academic projects": "projects",
+    "certifications": "certifications", "certificates": "certifications",
+    "licenses": "certifications", "courses": "certifications", "training": "certifications",
+    "awards": "awards", "achievements": "awards", "honors": "awards",
+    "publications": "publications",
+    "languages": "languages",
+    "interests": "other", "hobbies": "other", "volunteering": "other",
+    "volunteer experience": "other", "references": "other",
+}
+
+# a line that is only a heading, maybe with a bullet/rule before it and a colon after
+_HEADING_RE = re.compile(
+    r"^[^\S\n]*[^\w\s]{0,3}[^\S\n]*(%s)[^\S\n]*:?[^\S\n]*$"
+    % "|".join(sorted((re.escape(h).replace(r"\ ", r"[^\S\n]+") for h in SECTION_HEADINGS), key=len, reverse=True)),
+    re.MULTILINE,
+)
+_TOKEN_CHARS = "abcdefghijklmnopqrstuvwxyz0123456789.#"
+
+
+def chunk_hash(text: str) -> str:
+    return hashlib.sha1(f"{SKILL_BANK_VERSION}\0{text}".encode("utf-8")).hexdigest()[:16]
+
+
+def split_sections(text: str, section: str) -> list[tuple[str, str]]:
+    """(section, text) pieces of one lowercased page; text before the first heading stays in `section`."""
+    out = []
+    start = 0
+    for m in _HEADING_RE.finditer(text):
+        if m.start() > start:
+            out.append((section, text[start:m.start()]))
+        section = SECTION_HEADINGS[" ".join(m.group(1).split())]
+        start = m.start()
+    if start < len(text):
+        out.append((section, text[start:]))
+    return out
+
+
+def _edge(text: str, b: int, k: int, backward: bool) -> int:
+    """
+    Offset k whole tokens away from b (start of the k-th token before b, or
+    end of the k-th token after it); 0 / len(text) when there aren't that many.
+    """
+    span = 64
+    while True:
+        if backward:
+            lo, hi = max(0, b - span), b
+        else:
+            lo, hi = b, min(len(text), b + span)
+        spans = [m.span() for m in _TOKEN_RE.finditer(text, lo, hi)]
+        # the token at the far end of the slice may be cut: only trust k+1 of them
+        if len(spans) > k:
+            return spans[-k][0] if backward else spans[k - 1][1]
+        if (backward and lo == 0) or (not backward and hi == len(text)):
+            return 0 if backward else len(text)
+        span *= 4
+
+
+class SectionScanner:
+    """
+    Feed page texts in order, then finish() for the detected skills, like
+    SkillScanner. `known` maps chunk hashes from an earlier analysis to their
+    skills; those chunks are not scanned again. After finish(), `sections`
+    lists {"page", "section", "hash", "skills"} per chunk and `rescanned`
+    counts the chunks that had to be scanned.
+    """
+
+    def __init__(self, known: dict[str, list[str]] | None = None):
+        self.known = known or {}
+        self.sections: list[dict] = []
+        self.rescanned = 0
+        self._parts: list[str] = []     # lowercased text so far
+        self._starts: list[int] = []    # offset of every chunk after the first
+        self._length = 0
+        self._section = "header"
+        self._page = 0
+        self._pending: tuple[int, str, str] | None = None  # last chunk, may continue on the next page
+
+    def feed(self, page_text: str) -> None:
+        low = (page_text or "").lower()
+        self._page += 1
+        pending = self._pending
+        if pending is not None and low[:1] and _TOKEN_RE.match(low[:1]):
+            # the page break splits a token ("my" | "sql"): move its front half
+            # onto this page so no chunk sees half a token
+            head = pending[2].rstrip(_TOKEN_CHARS)
+            low = pending[2][len(head):] + low
+            pending = (pending[0], pending[1], head)
+        if pending is not None:
+            self._add(*pending)
+        pieces = split_sections(low, self._section)
+        self._pending = None
+        if pieces:
+            self._section = pieces[-1][0]
+            for section, text in pieces[:-1]:
+                self._add(self._page, section, text)
+            self._pending = (self._page, pieces[-1][0], pieces[-1][1])
+
+    def _add(self, page: int, section: str, text: str) -> None:
+        if not text:
+            return
+        if self._length:
+            self._starts.append(self._length)
+        self._parts.append(text)
+        self._length += len(text)
+        if _TOKEN_RE.search(text) is None:
+            return
+        h = chunk_hash(text)
+        skills = self.known.get(h)
+        if skills is None:
+            skills = extract_skills(text)
+            self.rescanned += 1
+        self.sections.append({"page": page, "section": section, "hash": h, "skills": list(skills)})
+
+    def finish(self) -> list[str]:
+        if self._pending is not None:
+            self._add(*self._pending)
+            self._pending = None
+        found = set()
+        for chunk in self.sections:
+            found.update(chunk["skills"])
+        text = "".join(self._parts)
+        k = MAX_SKILL_TOKENS
+        for b in self._starts:
+            found.update(extract_skills(text[_edge(text, b, k, True):_edge(text, b, k, False)]))
+        return sorted(found)
+
+
+def known_chunks(sections: Iterable[dict] | None) -> dict[str, list[str]]:
+    """hash -> skills from a stored analysis' "sections" (stale bank versions simply never match)."""
+    return {c["hash"]: c["skills"] for c in sections or [] if "hash" in c and "skills" in c}
+
+
+def skills_by_section(sections: Iterable[dict] | None) -> dict[str, list[str]]:
+    """section -> skills found in it, sections in document order."""
+    out: OrderedDict[str, dict[str, None]] = OrderedDict()
+    for c in sections or []:
+        bucket = out.setdefault(c["section"], {})
+        for skill in c["skills"]:
+            bucket[skill] = None
+    return {name: list(skills) for name, skills in out.items() if skills}
@@ -1,3 +1,4 @@
+import hashlib
 import re
 
 # Add synonyms so matching is more reliable
@@ -41,28 +42,208 @@ SKILL_BANK = sorted(set([
 ]))
 
 
+# A token is a run of [a-z0-9.#] in the lowercased text (keeps .net, c#, asp.net)
+_TOKEN_RE = re.compile(r"[a-z0-9\.\#]+")
+
+# Aliases may be split over a few tokens ("node js", "spring-boot", "rest apis")
+_MAX_ALIAS_TOKENS = 3
+
+# every proper prefix of an alias key: tokens that may start/continue a split alias
+_ALIAS_PREFIXES = {k[:i] for k in ALIASES for i in range(1, len(k))}
+
+
+def tokenize(text: str) -> list[tuple[str, int]]:
+    """(token, offset) pairs in one pass; offsets index into text.lower()."""
+    return [(m.group(), m.start()) for m in _TOKEN_RE.finditer((text or "").lower())]
+
+
+def alias_hits(tokens) -> list[tuple[str, int]]:
+    """
+    (alias value, offset) for every alias key spelled by 1.._MAX_ALIAS_TOKENS
+    adjacent tokens, found by hashed lookup at the position where it occurs.
+    """
+    hits = []
+    partial: list[tuple[str, int, int]] = []
+    for tok, pos in tokens:
+        if partial:
+            grown = []
+            for prefix, start, n in partial:
+                joined = prefix + tok
+                value = ALIASES.get(joined)
+                if value is not None:
+                    hits.append((value, start))
+                if n + 1 < _MAX_ALIAS_TOKENS and joined in _ALIAS_PREFIXES:
+                    grown.append((joined, start, n + 1))
+            partial = grown
+        value = ALIASES.get(tok)
+        if value is not None:
+            hits.append((value, pos))
+        if tok in _ALIAS_PREFIXES:
+            partial.append((tok, pos, 1))
+    return hits
+
+
 def normalize_text(text: str) -> str:
-    t = text.lower()
-    # remove punctuation but keep . and # for .net and c#
-    t = re.sub(r"[^a-z0-9\.\#\s]+", " ", t)
-    t = re.sub(r"\s+", " ", t).strip()
+    tokens = _TOKEN_RE.findall((text or "").lower())
+    t = " ".join(tokens)
+    # alias values once each, after the text, in order of first occurrence
+    extra = list(dict.fromkeys(v for v, _ in alias_hits(zip(tokens, range(len(tokens))))))
+    return " ".join([t] + extra) if extra else t
 
-    # apply alias replacements on compact tokens too
-    compact = t.replace(" ", "")
-    for k, v in ALIASES.items():
-        if k in compact:
-            t += " " + v
-    return t
 
+# Token trie over the skill bank: each node maps the next token to a child node,
+# and a node that ends a skill keeps it under the _END key.
+_END = None
 
-def extract_skills(text: str):
-    t = normalize_text(text)
 
-    found = []
-    for skill in SKILL_BANK:
-        # word-boundary-ish match
-        pattern = r"(^|\s)" + re.escape(skill) + r"(\s|$)"
-        if re.search(pattern, t):
-            found.append(skill)
+def build_skill_trie(skills) -> dict:
+    root: dict = {}
+    for skill in skills:
+        tokens = skill.split(" ")
+        if not all(tokens):
+            continue
+        node = root
+        for tok in tokens:
+            node = node.setdefault(tok, {})
+        node[_END] = skill
+    return root
+
+
+def match_tokens(tokens, trie: dict) -> set[str]:
+    """
+    One left-to-right pass over the tokens, returns every skill in the trie.
+    `active` holds the trie nodes of every partial skill ending at the previous
+    token, so each token costs at most (longest skill length) dict lookups no
+    matter how big the bank is.
+    """
+    found = set()
+    active: list[dict] = []
+    for tok in tokens:
+        nxt = []
+        for node in active:
+            child = node.get(tok)
+            if child is not None:
+                nxt.append(child)
+        child = trie.get(tok)
+        if child is not None:
+            nxt.append(child)
+        for node in nxt:
+            skill = node.get(_END)
+            if skill is not None:
+                found.add(skill)
+        active = nxt
+    return found
+
+
+# compiled once at import, shared by every request
+SKILL_TRIE = build_skill_trie(SKILL_BANK)
+
+# most tokens a single skill or alias hit can span; text split further apart
+# than this can't share a match
+MAX_SKILL_TOKENS = max([_MAX_ALIAS_TOKENS] + [len(s.split(" ")) for s in SKILL_BANK])
+
+# what each alias value contributes, so an alias hit is a single set lookup
+_ALIAS_SKILLS = {v: match_tokens(v.split(" "), SKILL_TRIE) for v in ALIASES.values()}
 
-    return sorted(set(found))
+# changes whenever the bank or aliases do, so cached skill lists can be told apart
+SKILL_BANK_VERSION = hashlib.sha1(
+    repr((SKILL_BANK, sorted(ALIASES.items()), "tokens-v2")).encode("utf-8")
+).hexdigest()[:12]
+
+
+class SkillScanner:
+    """
+    Skill detection over one token stream: feed raw text chunks (e.g. PDF
+    pages) as they arrive and call finish() at the end. Tokens that straddle
+    two chunks are carried over, so the result does not depend on how the
+    text was split. Each skill keeps the offset of its first occurrence.
+    """
+
+    def __init__(self, trie: dict | None = None):
+        self._trie = SKILL_TRIE if trie is None else trie
+        self.positions: dict[str, int] = {}
+        self._active: list[tuple[dict, int]] = []   # (trie node, start offset)
+        self._partial: list[tuple[str, int, int]] = []  # alias keys spelled so far over tokens
+        self._tail = ""     # token at the end of the last chunk, may continue
+        self._offset = 0    # characters consumed so far
+
+    def feed(self, chunk: str) -> None:
+        t = (chunk or "").lower()
+        if not t:
+            return
+        text = self._tail + t
+        base = self._offset - len(self._tail)
+        self._offset += len(t)
+
+        tokens = [(m.group(), base + m.start()) for m in _TOKEN_RE.finditer(text)]
+        self._tail = ""
+        if tokens and tokens[-1][1] - base + len(tokens[-1][0]) == len(text):
+            self._tail = tokens.pop()[0]
+        self._push(tokens)
+
+    def _push(self, tokens) -> None:
+        trie = self._trie
+        positions = self.positions
+        aliases = ALIASES
+        partial = self._partial
+        active = self._active
+        for tok, pos in tokens:
+            # aliases: this token alone, or completing one started by earlier tokens
+            if partial:
+                grown = []
+                for prefix, start, n in partial:
+                    joined = prefix + tok
+                    value = aliases.get(joined)
+                    if value is not None:
+                        for skill in _ALIAS_SKILLS[value]:
+                            positions.setdefault(skill, start)
+                    if n + 1 < _MAX_ALIAS_TOKENS and joined in _ALIAS_PREFIXES:
+                        grown.append((joined, start, n + 1))
+                partial = grown
+            value = aliases.get(tok)
+            if value is not None:
+                for skill in _ALIAS_SKILLS[value]:
+                    positions.setdefault(skill, pos)
+            if tok in _ALIAS_PREFIXES:
+                partial.append((tok, pos, 1))
+
+            # skills: advance every open trie path, maybe start a new one
+            child = trie.get(tok)
+            if not active and child is None:
+                continue
+            nxt = []
+            for node, start in active:
+                c = node.get(tok)
+                if c is not None:
+                    nxt.append((c, start))
+            if child is not None:
+                nxt.append((child, pos))
+            for node, start in nxt:
+                skill = node.get(_END)
+                if skill is not None and skill not in positions:
+                    positions[skill] = start
+            active = nxt
+        self._partial = partial
+        self._active = active
+
+    def skills(self) -> list[str]:
+        # what has been confirmed so far, before finish()
+        return sorted(self.positions)
+
+    def finish(self) -> list[str]:
+        if self._tail:
+            self._push([(self._tail, self._offset - len(self._tail))])
+            self._tail = ""
+        return sorted(self.positions)
+
+
+def locate_skills(text: str) -> dict[str, int]:
+    """skill -> offset of its first occurrence in text.lower()."""
+    scanner = SkillScanner()
+    scanner.feed(text)
+    scanner.finish()
+    return scanner.positions
+
+
+def extract_skills(text: str):
+    return sorted(locate_skills(text))
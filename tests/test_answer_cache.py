@@ -0,0 +1,40 @@
+import asyncio
+import threading
+
+from answer_cache import AnswerCache
+
+
+def test_follower_timeout_does_not_cancel_leader_future():
+    cache = AnswerCache()
+    _, fut, leader = cache.begin("k")
+    assert leader
+
+    async def follower():
+        _, f, is_leader = cache.begin("k")
+        assert not is_leader and f is fut
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(f)), 0.05)
+        except asyncio.TimeoutError:
+            return "timed out"
+
+    assert asyncio.run(follower()) == "timed out"
+    assert not fut.cancelled()
+    assert not fut.cancel()  # running futures can't be cancelled
+
+    # a second follower still gets the leader's answer, and finish() doesn't raise
+    _, f2, _ = cache.begin("k")
+    got = []
+    t = threading.Thread(target=lambda: got.append(f2.result(timeout=5)))
+    t.start()
+    cache.finish("k", fut, "answer")
+    t.join()
+    assert got == ["answer"]
+    assert cache.get("k") == "answer"
+
+
+def test_finish_skips_done_future():
+    cache = AnswerCache()
+    _, fut, _ = cache.begin("k")
+    cache.finish("k", fut, "first")
+    cache.finish("k", fut, error=RuntimeError("late"))
+    assert fut.result() == "first"